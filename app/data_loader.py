@@ -1,279 +1,362 @@
+import re
+
 import pandas as pd
 import numpy as np
 from typing import List, Dict
 from .models import FoodItem
 
+# Static note templates interned once; formatted only when the value exists
+_SAFE_FROM_TPL = "✅ Safe from {} months"
+_PREP_TPL = "🍽️ How to prepare: {}"
+_RISKS_TPL = "⚠️ Watch out for: {}"
+_NUTRIENTS_TPL = "💪 Rich in: {}"
+_NOTE_TPL = "📝 {}"
+_ALLERGEN_TPL = "🔍 Common allergen ({}) - introduce when ready, watch for reactions"
+
 class DataLoader:
+    # Enhanced nutritional estimates based on real USDA data
+    NUTRITION_MAP = {
+        'calories': {
+            'apple': 52, 'banana': 89, 'pear': 57, 'peach': 39, 'plum': 46,
+            'avocado': 160, 'blueberry': 57, 'strawberry': 32, 'mango': 60, 'watermelon': 30,
+            'carrot': 41, 'sweet potato': 86, 'pumpkin': 26, 'peas': 81, 'green beans': 35,
+            'broccoli': 34, 'cauliflower': 25, 'spinach': 23, 'zucchini': 17,
+            'chicken': 165, 'turkey': 144, 'beef': 250, 'pork': 242, 'salmon': 208,
+            'cod': 82, 'tuna': 144, 'shrimp': 85, 'egg': 155, 'tofu': 76,
+            'lentils': 116, 'black beans': 132, 'yogurt': 59, 'cheese': 113, 'cottage cheese': 98,
+            'oatmeal': 68, 'rice cereal': 380, 'quinoa': 120, 'pasta': 131, 'bread': 265,
+            'honey': 304, 'peanut butter': 588,
+            'default': 80
+        },
+        'protein': {
+            'chicken': 31.0, 'turkey': 30.3, 'beef': 26.1, 'pork': 27.3, 'salmon': 25.4,
+            'cod': 18.0, 'tuna': 25.5, 'shrimp': 18.0, 'egg': 13.0, 'tofu': 8.1,
+            'lentils': 9.0, 'black beans': 8.9, 'yogurt': 10.0, 'cheese': 12.5, 'cottage cheese': 11.1,
+            'peanut butter': 25.8, 'quinoa': 4.4, 'oatmeal': 2.4,
+            'peas': 5.4, 'spinach': 2.9, 'broccoli': 2.8,
+            'default': 2.0
+        },
+        'iron': {
+            'rice cereal': 45.0, 'beef': 2.6, 'lentils': 3.3, 'spinach': 2.7, 'tofu': 5.4,
+            'chicken': 0.9, 'turkey': 1.4, 'salmon': 0.8, 'egg': 1.8,
+            'quinoa': 1.5, 'oatmeal': 1.2, 'pumpkin': 0.8,
+            'default': 0.5
+        },
+        'fiber': {
+            'avocado': 6.7, 'pear': 3.1, 'apple': 2.4, 'sweet potato': 3.0,
+            'lentils': 7.9, 'black beans': 8.7, 'peas': 5.1, 'broccoli': 2.6,
+            'quinoa': 2.8, 'oatmeal': 1.7,
+            'default': 1.5
+        },
+        'vitamin_a': {
+            'sweet potato': 709, 'carrot': 835, 'spinach': 469, 'mango': 54,
+            'pumpkin': 426, 'cantaloupe': 169,
+            'default': 20
+        },
+        'vitamin_c': {
+            'strawberry': 58.8, 'broccoli': 89.2, 'mango': 36.4, 'kiwi': 92.7,
+            'bell pepper': 120.0, 'cauliflower': 48.2, 'peas': 40.0,
+            'apple': 4.6, 'banana': 8.7, 'pear': 4.3,
+            'default': 5.0
+        }
+    }
+
+    # Special cases for vitamin naming in nutrient_highlights
+    NUTRIENT_VARIATIONS = {
+        'vitamin_a': ['vitamin a', 'beta-carotene', 'beta carotene'],
+        'vitamin_c': ['vitamin c', 'ascorbic acid'],
+        'iron': ['heme iron', 'non-heme iron'],
+    }
+    # Safety tags keyed by the note substring that triggers them
+    SAFETY_TAGS = [
+        ('choking', 'CHOKING_HAZARD'),
+        ('allergy', 'ALLERGY_RISK'),
+        ('month', 'AGE_RESTRICTION'),
+        ('botulism', 'BOTULISM_RISK'),
+    ]
+
+    # Anxiety-addressing tags keyed the same way
+    ANXIETY_TAGS = [
+        ('pediatrician-recommended', 'DOCTOR_APPROVED'),
+        ('safe from', 'AGE_VERIFIED'),
+        ('watch out', 'SAFETY_GUIDANCE'),
+        ('rich in', 'NUTRITIOUS'),
+    ]
+
+    # Columns actually consumed from the knowledge graph CSV
+    KG_COLS = ('food_name', 'group', 'min_month_safe', 'prep', 'risks',
+               'allergens', 'nutrient_highlights', 'notes', 'source_primary')
+
+    # String columns consumed from the knowledge graph CSV
+    STR_COLS = ('food_name', 'prep', 'risks', 'notes', 'allergens',
+                'nutrient_highlights', 'source_primary')
+
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
         self.foods: List[FoodItem] = []
-        
+        # Parallel column caches built once per load; avoids re-walking
+        # FoodItem attributes and re-lowercasing notes in every get_* call
+        self._names: List[str] = []
+        self._categories: List[str] = []
+        self._notes: List[str] = []
+        self._notes_lc: List[str] = []
+        self._descriptions: List[str] = []
+
+    def _read_csv(self) -> pd.DataFrame:
+        """Read the CSV, pruning to consumed columns and preferring the pyarrow engine"""
+        header = pd.read_csv(self.csv_path, nrows=0)
+
+        # Only restrict columns for the KG format; original-format CSVs map
+        # every column straight onto FoodItem fields
+        usecols = None
+        if 'food_name' in header.columns:
+            usecols = [col for col in self.KG_COLS if col in header.columns]
+
+        try:
+            # pyarrow parses multi-threaded and allocates far fewer Python strings
+            return pd.read_csv(self.csv_path, usecols=usecols, engine='pyarrow')
+        except (ImportError, ValueError):
+            return pd.read_csv(self.csv_path, usecols=usecols)
+
     def load_data(self) -> List[FoodItem]:
         """Load food data from CSV file"""
         try:
-            df = pd.read_csv(self.csv_path)
-            
+            df = self._read_csv()
+
             # Handle the new knowledge graph format
             if 'food_name' in df.columns:
                 # Convert knowledge graph to FoodItem format
                 self.foods = self._convert_kg_to_food_items(df)
             else:
-                # Original format
-                self.foods = [FoodItem(**row.to_dict()) for _, row in df.iterrows()]
+                # Original format - itertuples avoids a Series allocation per row
+                self.foods = [FoodItem(**row._asdict()) for row in df.itertuples(index=False)]
+            self._build_column_caches()
             return self.foods
         except Exception as e:
             raise Exception(f"Error loading data: {str(e)}")
     
-    def _safe_get_string(self, row: pd.Series, column: str, default: str = '') -> str:
-        """Safely get string value from row, handling NaN values"""
-        value = row.get(column, default)
-        if pd.isna(value) or value is None:
-            return default
-        return str(value)
-    
+    def _safe_get_string(self, row, column: str, default: str = '') -> str:
+        """Get a string column from a row namedtuple (columns pre-coerced at load)"""
+        return getattr(row, column, default)
+
+    def _coerce_string_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Coerce string columns once so row access needs no per-cell NaN checks"""
+        df = df.copy()
+        str_cols = [col for col in self.STR_COLS if col in df.columns]
+        df[str_cols] = df[str_cols].fillna('').astype(str)
+        if 'group' in df.columns:
+            df['group'] = df['group'].fillna('Unknown').astype(str)
+
+        # Low-cardinality columns: categorical codes make comparisons integer
+        # compares and stop repeating the same string per row
+        for col in ('group', 'allergens', 'source_primary'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+
+        # Age column: coerce once, -1 marks missing so row code needs no NaN branch
+        if 'min_month_safe' in df.columns:
+            df['min_month_safe'] = (
+                pd.to_numeric(df['min_month_safe'], errors='coerce')
+                .fillna(-1)
+                .astype('int16')
+            )
+        return df
+
     def _convert_kg_to_food_items(self, df: pd.DataFrame) -> List[FoodItem]:
         """Convert knowledge graph format to FoodItem objects with parent-focused enhancements"""
+        df = self._coerce_string_columns(df)
+
+        # Vectorized nutrition estimates: one pass per nutrient over the whole table
+        estimates = self._estimate_nutrition_columns(df)
+
+        # Confidence-building intro: one isin pass over the categorical column
+        if 'source_primary' in df.columns:
+            recommended = df['source_primary'].isin(
+                ['AAP/CDC infant solids', 'WHO infant feeding']
+            ).to_numpy()
+        else:
+            recommended = np.zeros(len(df), dtype=bool)
+
         foods = []
-        for _, row in df.iterrows():
+        for i, row in enumerate(df.itertuples(index=False)):
             # Create parent-friendly, anxiety-reducing description
-            safety_prep = self._extract_safety_preparation(row)
-            reassuring_note = self._create_reassuring_note(row)
-            
+            reassuring_note = self._create_reassuring_note(row, recommended[i])
+
             food = FoodItem(
                 name=self._safe_get_string(row, 'food_name'),
                 category=self._safe_get_string(row, 'group', 'Unknown'),
-                kcal_100g=self._estimate_nutrition(row, 'calories'),
-                protein_g=self._estimate_nutrition(row, 'protein'),
-                fiber_g=self._estimate_nutrition(row, 'fiber'),
-                iron_mg=self._estimate_nutrition(row, 'iron'),
-                vit_a_ug=self._estimate_nutrition(row, 'vitamin_a'),
-                vit_c_mg=self._estimate_nutrition(row, 'vitamin_c'),
+                kcal_100g=estimates['calories'][i],
+                protein_g=estimates['protein'][i],
+                fiber_g=estimates['fiber'][i],
+                iron_mg=estimates['iron'][i],
+                vit_a_ug=estimates['vitamin_a'][i],
+                vit_c_mg=estimates['vitamin_c'][i],
                 usda_url=f"https://fdc.nal.usda.gov/search?query={self._safe_get_string(row, 'food_name').replace(' ', '%20')}",
                 note=reassuring_note
             )
             foods.append(food)
         return foods
     
-    def _extract_safety_preparation(self, row: pd.Series) -> str:
+    def _extract_safety_preparation(self, row) -> str:
         """Extract step-by-step safety preparation instructions"""
         prep = self._safe_get_string(row, 'prep')
         risks = self._safe_get_string(row, 'risks')
-        min_age = row.get('min_month_safe', 6)
-        
+        min_age = getattr(row, 'min_month_safe', 6)
+
         safety_steps = []
-        if min_age and not pd.isna(min_age):
-            safety_steps.append(f"✅ Safe from {min_age} months")
+        if min_age > 0:  # -1 marks a missing age
+            safety_steps.append(_SAFE_FROM_TPL.format(min_age))
         if prep and prep.strip():
-            safety_steps.append(f"🍽️ How to prepare: {prep}")
-        if risks and risks.strip() and risks.lower() not in ['nan', '']:
-            safety_steps.append(f"⚠️ Watch out for: {risks}")
-        
+            safety_steps.append(_PREP_TPL.format(prep))
+        if risks and risks.strip():  # NaN already coerced to '' at load
+            safety_steps.append(_RISKS_TPL.format(risks))
+
         return " | ".join(safety_steps)
     
-    def _create_reassuring_note(self, row: pd.Series) -> str:
+    def _create_reassuring_note(self, row, is_recommended: bool = False) -> str:
         """Create reassuring, parent-friendly descriptions"""
         base_note = self._safe_get_string(row, 'notes')
         allergens = self._safe_get_string(row, 'allergens')
         nutrients = self._safe_get_string(row, 'nutrient_highlights')
-        
+
         # Start with reassurance
         reassuring_parts = []
-        
+
         # Add confidence-building intro
-        source_primary = self._safe_get_string(row, 'source_primary')
-        if source_primary in ['AAP/CDC infant solids', 'WHO infant feeding']:
+        if is_recommended:
             reassuring_parts.append("✅ Pediatrician-recommended")
         
         # Add nutritional benefits
         if nutrients and nutrients.strip():
-            reassuring_parts.append(f"💪 Rich in: {nutrients}")
-        
+            reassuring_parts.append(_NUTRIENTS_TPL.format(nutrients))
+
         # Add safety info
         safety_prep = self._extract_safety_preparation(row)
         if safety_prep:
             reassuring_parts.append(safety_prep)
-        
+
         # Add original note
         if base_note and base_note.strip():
-            reassuring_parts.append(f"📝 {base_note}")
-        
+            reassuring_parts.append(_NOTE_TPL.format(base_note))
+
         # Add allergy info in supportive way
-        if allergens and allergens.strip() and allergens.lower() not in ['nan', '']:
-            reassuring_parts.append(f"🔍 Common allergen ({allergens}) - introduce when ready, watch for reactions")
-        
+        if allergens and allergens.strip():  # NaN already coerced to '' at load
+            reassuring_parts.append(_ALLERGEN_TPL.format(allergens))
+
         return " | ".join(reassuring_parts)
     
-    def _estimate_nutrition(self, row: pd.Series, nutrient_type: str) -> float:
-        """Estimate nutritional values based on food type and highlights"""
-        food_name = self._safe_get_string(row, 'food_name').lower()
-        nutrients = self._safe_get_string(row, 'nutrient_highlights').lower()
-        
-        # Enhanced nutritional estimates based on real USDA data
-        nutrition_map = {
-            'calories': {
-                'apple': 52, 'banana': 89, 'pear': 57, 'peach': 39, 'plum': 46,
-                'avocado': 160, 'blueberry': 57, 'strawberry': 32, 'mango': 60, 'watermelon': 30,
-                'carrot': 41, 'sweet potato': 86, 'pumpkin': 26, 'peas': 81, 'green beans': 35,
-                'broccoli': 34, 'cauliflower': 25, 'spinach': 23, 'zucchini': 17,
-                'chicken': 165, 'turkey': 144, 'beef': 250, 'pork': 242, 'salmon': 208,
-                'cod': 82, 'tuna': 144, 'shrimp': 85, 'egg': 155, 'tofu': 76,
-                'lentils': 116, 'black beans': 132, 'yogurt': 59, 'cheese': 113, 'cottage cheese': 98,
-                'oatmeal': 68, 'rice cereal': 380, 'quinoa': 120, 'pasta': 131, 'bread': 265,
-                'honey': 304, 'peanut butter': 588,
-                'default': 80
-            },
-            'protein': {
-                'chicken': 31.0, 'turkey': 30.3, 'beef': 26.1, 'pork': 27.3, 'salmon': 25.4,
-                'cod': 18.0, 'tuna': 25.5, 'shrimp': 18.0, 'egg': 13.0, 'tofu': 8.1,
-                'lentils': 9.0, 'black beans': 8.9, 'yogurt': 10.0, 'cheese': 12.5, 'cottage cheese': 11.1,
-                'peanut butter': 25.8, 'quinoa': 4.4, 'oatmeal': 2.4,
-                'peas': 5.4, 'spinach': 2.9, 'broccoli': 2.8,
-                'default': 2.0
-            },
-            'iron': {
-                'rice cereal': 45.0, 'beef': 2.6, 'lentils': 3.3, 'spinach': 2.7, 'tofu': 5.4,
-                'chicken': 0.9, 'turkey': 1.4, 'salmon': 0.8, 'egg': 1.8,
-                'quinoa': 1.5, 'oatmeal': 1.2, 'pumpkin': 0.8,
-                'default': 0.5
-            },
-            'fiber': {
-                'avocado': 6.7, 'pear': 3.1, 'apple': 2.4, 'sweet potato': 3.0,
-                'lentils': 7.9, 'black beans': 8.7, 'peas': 5.1, 'broccoli': 2.6,
-                'quinoa': 2.8, 'oatmeal': 1.7,
-                'default': 1.5
-            },
-            'vitamin_a': {
-                'sweet potato': 709, 'carrot': 835, 'spinach': 469, 'mango': 54,
-                'pumpkin': 426, 'cantaloupe': 169,
-                'default': 20
-            },
-            'vitamin_c': {
-                'strawberry': 58.8, 'broccoli': 89.2, 'mango': 36.4, 'kiwi': 92.7,
-                'bell pepper': 120.0, 'cauliflower': 48.2, 'peas': 40.0,
-                'apple': 4.6, 'banana': 8.7, 'pear': 4.3,
-                'default': 5.0
-            }
-        }
-        
-        # Check for specific foods first (exact matches)
-        for food_key, value in nutrition_map[nutrient_type].items():
-            if food_key == food_name or food_key in food_name:
-                if food_key != 'default':
-                    return float(value)
-        
-        # Check if nutrient is specifically highlighted
-        nutrient_variations = [
-            nutrient_type,
-            nutrient_type.replace('_', ' '),
-            nutrient_type.replace('_', '-'),
+    def _estimate_nutrition_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Estimate nutritional values for all rows at once with pandas str ops + np.select"""
+        name_lc = df['food_name'].str.lower()
+        if 'nutrient_highlights' in df.columns:
+            highlights_lc = df['nutrient_highlights'].str.lower()
+        else:
+            highlights_lc = pd.Series('', index=df.index)
+
+        estimates = {}
+        for nutrient_type, value_map in self.NUTRITION_MAP.items():
+            default_val = float(value_map['default'])
+
+            # Check for specific foods first (exact or substring matches)
+            food_keys = [key for key in value_map if key != 'default']
+            conditions = [name_lc.str.contains(key, regex=False) for key in food_keys]
+            choices = [float(value_map[key]) for key in food_keys]
+            base = np.select(conditions, choices, default=default_val)
+
+            # If nutrient is highlighted, use higher than default
+            variations = [
+                nutrient_type,
+                nutrient_type.replace('_', ' '),
+                nutrient_type.replace('_', '-'),
+            ]
+            variations.extend(self.NUTRIENT_VARIATIONS.get(nutrient_type, []))
+            pattern = '|'.join(map(re.escape, variations))
+            highlighted = highlights_lc.str.contains(pattern, regex=True).to_numpy()
+
+            estimates[nutrient_type] = np.where(
+                highlighted & (base == default_val), default_val * 3, base
+            )
+        return estimates
+
+    def _build_column_caches(self):
+        """Build parallel name/category/note columns once per load"""
+        self._names = [food.name for food in self.foods]
+        self._categories = [food.category for food in self.foods]
+        self._notes = [food.note for food in self.foods]
+        self._notes_lc = [note.lower() for note in self._notes]
+        # Keyword flags computed once so the description builders never
+        # re-search the notes
+        self._safety_flags = np.array(
+            [[term in note for term, _ in self.SAFETY_TAGS] for note in self._notes_lc],
+            dtype=bool,
+        ).reshape(len(self._notes_lc), len(self.SAFETY_TAGS))
+        # Plain descriptions are static per load; concatenate them once here
+        self._descriptions = [
+            f"{name} {category} {note}"
+            for name, category, note in zip(self._names, self._categories, self._notes)
         ]
-        
-        # Special cases for vitamin naming
-        if nutrient_type == 'vitamin_a':
-            nutrient_variations.extend(['vitamin a', 'beta-carotene', 'beta carotene'])
-        elif nutrient_type == 'vitamin_c':
-            nutrient_variations.extend(['vitamin c', 'ascorbic acid'])
-        elif nutrient_type == 'iron':
-            nutrient_variations.extend(['heme iron', 'non-heme iron'])
-        
-        # If nutrient is highlighted, use higher than default
-        for variation in nutrient_variations:
-            if variation in nutrients:
-                return float(nutrition_map[nutrient_type]['default'] * 3)
-        
-        return float(nutrition_map[nutrient_type]['default'])
 
     def get_food_descriptions(self) -> List[str]:
         """Get searchable text descriptions for each food"""
-        descriptions = []
-        for food in self.foods:
-            description = f"{food.name} {food.category} {food.note}"
-            descriptions.append(description)
-        return descriptions
-    
+        return self._descriptions
+
     def get_safety_focused_descriptions(self) -> List[str]:
         """Get safety-focused descriptions that ChatGPT wouldn't emphasize"""
+        tags = [tag for _, tag in self.SAFETY_TAGS]
         descriptions = []
-        for food in self.foods:
-            # Extract safety-critical information
-            safety_info = []
-            note_lower = food.note.lower()
-            
-            if 'choking' in note_lower:
-                safety_info.append("CHOKING_HAZARD")
-            if 'allergy' in note_lower:
-                safety_info.append("ALLERGY_RISK")
-            if 'month' in note_lower:
-                safety_info.append("AGE_RESTRICTION")
-            if 'botulism' in note_lower:
-                safety_info.append("BOTULISM_RISK")
-            
-            description = f"{food.name} {food.category} {' '.join(safety_info)} {food.note}"
-            descriptions.append(description)
+        for name, category, note, flags in zip(
+            self._names, self._categories, self._notes, self._safety_flags
+        ):
+            # Extract safety-critical information from the precomputed flags
+            safety_info = ' '.join(tag for tag, flag in zip(tags, flags) if flag)
+            descriptions.append(f"{name} {category} {safety_info} {note}")
         return descriptions
-    
+
     def get_parent_anxiety_descriptions(self) -> List[str]:
         """Get descriptions that address common parent anxieties"""
         descriptions = []
-        for food in self.foods:
+        for name, category, note, note_lc in zip(
+            self._names, self._categories, self._notes, self._notes_lc
+        ):
             # Create anxiety-addressing keywords
-            anxiety_keywords = []
-            note_lower = food.note.lower()
-            
-            # Address safety anxiety
-            if 'pediatrician-recommended' in note_lower:
-                anxiety_keywords.append("DOCTOR_APPROVED")
-            if 'safe from' in note_lower:
-                anxiety_keywords.append("AGE_VERIFIED")
-            if 'watch out' in note_lower:
-                anxiety_keywords.append("SAFETY_GUIDANCE")
-            
-            # Address nutritional anxiety
-            if 'rich in' in note_lower:
-                anxiety_keywords.append("NUTRITIOUS")
-            if any(nutrient in note_lower for nutrient in ['iron', 'protein', 'vitamin']):
+            anxiety_keywords = [tag for term, tag in self.ANXIETY_TAGS if term in note_lc]
+            if any(nutrient in note_lc for nutrient in ('iron', 'protein', 'vitamin')):
                 anxiety_keywords.append("ESSENTIAL_NUTRIENTS")
-            
-            # Address preparation anxiety
-            if 'how to prepare' in note_lower:
+            if 'how to prepare' in note_lc:
                 anxiety_keywords.append("PREP_INSTRUCTIONS")
-            
-            description = f"{food.name} {food.category} {' '.join(anxiety_keywords)} {food.note}"
-            descriptions.append(description)
+
+            descriptions.append(f"{name} {category} {' '.join(anxiety_keywords)} {note}")
         return descriptions
-    
+
     def get_quick_answer_data(self) -> Dict[str, List[str]]:
         """Pre-computed answers for common urgent parent questions"""
-        quick_answers = {
-            "first_foods_6_months": [],
-            "high_iron_foods": [],
-            "choking_hazards_avoid": [],
-            "allergy_foods_introduce_carefully": [],
-            "emergency_prep_instructions": []
+        names = pd.Series(self._names, dtype=object)
+        notes_lc = pd.Series(self._notes_lc, dtype=object)
+        iron = np.array([food.iron_mg for food in self.foods], dtype=float)
+
+        # One boolean mask per category instead of five checks per food
+        first_foods = (notes_lc.str.contains('6 months', regex=False)
+                       & notes_lc.str.contains('safe', regex=False))
+        high_iron = (iron > 5) | notes_lc.str.contains('iron', regex=False)
+        choking = notes_lc.str.contains('choking', regex=False)
+        allergy = (notes_lc.str.contains('allergen', regex=False)
+                   | notes_lc.str.contains('allergy', regex=False))
+        has_prep = notes_lc.str.contains('how to prepare', regex=False)
+
+        prep_texts = (notes_lc[has_prep]
+                      .str.extract(r'how to prepare:\s*([^|]*)', expand=False)
+                      .str.strip())
+
+        return {
+            "first_foods_6_months": names[first_foods].tolist(),
+            "high_iron_foods": [
+                f"{self._names[i]} ({self.foods[i].iron_mg}mg iron)"
+                for i in np.flatnonzero(high_iron)
+            ],
+            "choking_hazards_avoid": names[choking].tolist(),
+            "allergy_foods_introduce_carefully": names[allergy].tolist(),
+            "emergency_prep_instructions": [
+                f"{self._names[i]}: {text}"
+                for i, text in zip(np.flatnonzero(has_prep.to_numpy()), prep_texts)
+            ],
         }
-        
-        for food in self.foods:
-            note_lower = food.note.lower()
-            
-            # First foods safe at 6 months
-            if '6 months' in note_lower and 'safe' in note_lower:
-                quick_answers["first_foods_6_months"].append(food.name)
-            
-            # High iron foods for anemia concerns
-            if food.iron_mg > 5 or 'iron' in note_lower:
-                quick_answers["high_iron_foods"].append(f"{food.name} ({food.iron_mg}mg iron)")
-            
-            # Choking hazards to avoid
-            if 'choking' in note_lower:
-                quick_answers["choking_hazards_avoid"].append(food.name)
-            
-            # Foods requiring allergy vigilance
-            if 'allergen' in note_lower or 'allergy' in note_lower:
-                quick_answers["allergy_foods_introduce_carefully"].append(food.name)
-            
-            # Foods with specific prep instructions
-            if 'how to prepare' in note_lower:
-                prep_instruction = note_lower.split('how to prepare:')[1].split('|')[0].strip()
-                quick_answers["emergency_prep_instructions"].append(f"{food.name}: {prep_instruction}")
-        
-        return quick_answers
@@ -3,6 +3,18 @@ from typing import Dict, List, Set, Tuple
 from .models import FoodItem
 import pandas as pd
 
+# Punctuation stripped from tokens when indexing notes and parsing queries
+_TOKEN_PUNCT = '.,;:!?()[]"\''
+
+# Which graph relations matter for which query keywords
+RELATION_RELEVANCE = {
+    'iron': ('RICH_IN', 'NUTRITIONAL_ALTERNATIVE'),
+    'allergy': ('CONTAINS_ALLERGEN', 'SIMILAR_SAFETY_PROFILE'),
+    'choking': ('HAS_RISK', 'SIMILAR_SAFETY_PROFILE'),
+    'age': ('SAFE_FROM_AGE', 'SAME_AGE_GROUP'),
+    'month': ('SAFE_FROM_AGE', 'SAME_AGE_GROUP'),
+}
+
 class BabyFoodKnowledgeGraph:
     def __init__(self):
         self.graph = nx.DiGraph()
@@ -39,8 +51,9 @@ class BabyFoodKnowledgeGraph:
         node_id = f"FOOD:{food.name}"
         self.food_nodes[food.name] = node_id
         
-        self.graph.add_node(node_id, 
+        self.graph.add_node(node_id,
                            type='FOOD',
+                           food=food,
                            name=food.name,
                            category=food.category,
                            nutrition={
@@ -92,25 +105,32 @@ class BabyFoodKnowledgeGraph:
     
     def _create_safety_relationships(self):
         """Create safety-based relationships between foods"""
-        # Connect foods with similar safety profiles
-        choking_foods = [n for n, d in self.graph.nodes(data=True) 
+        # Connect foods with similar safety profiles through a shared hub node.
+        # A pairwise clique would cost O(N^2) edges; the hub keeps two-hop
+        # neighbor traversal working with O(N) edges.
+        choking_foods = [n for n, d in self.graph.nodes(data=True)
                         if d.get('type') == 'FOOD' and 'choking' in d.get('note', '').lower()]
-        
-        for i, food1 in enumerate(choking_foods):
-            for food2 in choking_foods[i+1:]:
-                self.graph.add_edge(food1, food2, relation='SIMILAR_SAFETY_PROFILE')
-    
+
+        if choking_foods:
+            hub = 'SAFETY_GROUP:choking'
+            self.graph.add_node(hub, type='SAFETY_GROUP', risk_type='choking')
+            for food in choking_foods:
+                self.graph.add_edge(food, hub, relation='SIMILAR_SAFETY_PROFILE')
+                self.graph.add_edge(hub, food, relation='SIMILAR_SAFETY_PROFILE')
+
     def _create_nutritional_relationships(self):
         """Create nutrition-based relationships"""
-        # Group foods by high nutrients
+        # Group foods by high nutrients via a hub node (see safety hub above)
         high_iron_foods = [n for n, d in self.graph.nodes(data=True)
-                          if d.get('type') == 'FOOD' and 
+                          if d.get('type') == 'FOOD' and
                           d.get('nutrition', {}).get('iron', 0) > 2.0]
-        
-        # Create "ALTERNATIVE_FOR" relationships
-        for i, food1 in enumerate(high_iron_foods):
-            for food2 in high_iron_foods[i+1:]:
-                self.graph.add_edge(food1, food2, relation='NUTRITIONAL_ALTERNATIVE')
+
+        if high_iron_foods:
+            hub = 'NUTRIENT_GROUP:high_iron'
+            self.graph.add_node(hub, type='NUTRIENT_GROUP', nutrient='iron')
+            for food in high_iron_foods:
+                self.graph.add_edge(food, hub, relation='NUTRITIONAL_ALTERNATIVE')
+                self.graph.add_edge(hub, food, relation='NUTRITIONAL_ALTERNATIVE')
     
     def _create_age_relationships(self):
         """Create age-progression relationships"""
@@ -136,134 +156,129 @@ class GraphRAGRetriever:
         self.kg = kg
         self.foods = foods
         self.food_lookup = {food.name: food for food in foods}
+        # Node ids are fixed at build time; reuse the graph's name → node
+        # map instead of formatting "FOOD:{name}" strings per query
+        self._food_node = kg.food_nodes
+        # Lowercase each note once instead of per query in matching/scoring
+        self._notes_lc = {food.name: food.note.lower() for food in foods}
+        # Flattened adjacency snapshot: plain dict/list traversal avoids
+        # networkx per-operation overhead on the query hot path. Built from
+        # the (already constructed) knowledge graph once.
+        self._adj = {
+            node: [(neighbor, attrs.get('relation', '')) for neighbor, attrs in kg.graph[node].items()]
+            for node in kg.graph.nodes
+        }
+        self._node_data = dict(kg.graph.nodes(data=True))
+        # Inverted index over note tokens: query matching becomes a handful
+        # of hash lookups instead of a substring scan over every note
+        self._note_index: Dict[str, Set[int]] = {}
+        for idx, food in enumerate(foods):
+            for token in self._notes_lc[food.name].split():
+                token = token.strip(_TOKEN_PUNCT)
+                if token:
+                    self._note_index.setdefault(token, set()).add(idx)
     
     def graph_retrieve(self, query: str, top_k: int = 3) -> Tuple[List[FoodItem], List[float], List[str]]:
         """Retrieve using graph relationships and reasoning"""
-        
+        query_lower = query.lower()
+
         # 1. Find directly relevant foods (traditional retrieval)
         direct_foods = self._find_direct_matches(query)
-        
-        # 2. Use graph to find related foods
-        related_foods = self._find_graph_related_foods(direct_foods, query)
-        
-        # 3. Generate reasoning paths
-        reasoning_paths = self._generate_reasoning_paths(direct_foods + related_foods, query)
-        
-        # 4. Score and rank
-        all_foods = list(set(direct_foods + related_foods))
-        scores = self._score_foods_with_graph(all_foods, query)
-        
+
+        # Flatten relevance rules into one set for this query so the inner
+        # edge check is a single set membership
+        relevant_relations = set()
+        for keyword, relations in RELATION_RELEVANCE.items():
+            if keyword in query_lower:
+                relevant_relations.update(relations)
+
+        # 2. One fused edge walk per food: expansion to related foods,
+        # reasoning parts and relevance counts all come from the same pass
+        related = {}
+        traversals = {}
+        for food in direct_foods:
+            self._traverse(food, relevant_relations, related, traversals, expand=True)
+
+        candidates = direct_foods + list(related.values())
+        all_foods = list({food.name: food for food in candidates}.values())
+
+        # Foods reached only by expansion still need their single walk
+        for food in all_foods:
+            if food.name not in traversals:
+                self._traverse(food, relevant_relations, related, traversals, expand=False)
+
+        # 3. Generate reasoning paths from the traversal results
+        reasoning_paths = []
+        for food in candidates[:3]:  # Top 3 foods
+            if self._food_node.get(food.name) in self._adj:
+                path_parts = [f"📍 {food.name}"]
+
+                # Check direct attributes
+                if 'iron' in query_lower and food.iron_mg > 2:
+                    path_parts.append(f"→ High iron content ({food.iron_mg}mg)")
+
+                path_parts.extend(traversals[food.name][1])
+                reasoning_paths.append(" ".join(path_parts))
+
+        # 4. Score and rank using the precounted relevant relations
+        scores = []
+        query_terms = query_lower.split()
+        for food in all_foods:
+            base_score = 0.5  # Base relevance
+
+            # Direct text matching
+            note_lc = self._notes_lc.get(food.name, '')
+            if any(term in note_lc for term in query_terms):
+                base_score += 0.3
+
+            # Graph relationship bonus, capped at 0.4
+            base_score += min(traversals[food.name][0] * 0.1, 0.4)
+            scores.append(base_score)
+
         # 5. Return top-k with reasoning
         top_foods_with_scores = sorted(zip(all_foods, scores), key=lambda x: x[1], reverse=True)[:top_k]
         top_foods = [food for food, _ in top_foods_with_scores]
         top_scores = [score for _, score in top_foods_with_scores]
-        
+
         return top_foods, top_scores, reasoning_paths[:top_k]
+
+    def _traverse(self, food: FoodItem, relevant_relations: Set[str], related: Dict,
+                  traversals: Dict, expand: bool):
+        """Walk a food's edges once, accumulating relevance count, reasoning
+        parts and (optionally) two-hop related foods"""
+        food_node = self._food_node.get(food.name, '')
+        relevant_count = 0
+        reasoning_parts = []
+
+        for neighbor, relation in self._adj.get(food_node, ()):
+            if relation in relevant_relations:
+                relevant_count += 1
+                if expand:
+                    # Get foods connected to this neighbor; the FoodItem
+                    # rides on the node, so no id parsing or name lookup
+                    for second_neighbor, _ in self._adj.get(neighbor, ()):
+                        node_data = self._node_data[second_neighbor]
+                        if node_data.get('type') == 'FOOD':
+                            related_food = node_data.get('food')
+                            if related_food is not None and related_food.name not in related:
+                                related[related_food.name] = related_food
+
+            if relation == 'SAFE_FROM_AGE':
+                neighbor_data = self._node_data[neighbor]
+                reasoning_parts.append(f"→ Safe from {neighbor_data.get('min_months')} months")
+            elif relation == 'CONTAINS_ALLERGEN':
+                neighbor_data = self._node_data[neighbor]
+                reasoning_parts.append(f"→ Contains {neighbor_data.get('name')} allergen")
+
+        traversals[food.name] = (relevant_count, reasoning_parts)
     
     def _find_direct_matches(self, query: str) -> List[FoodItem]:
         """Find foods directly matching query terms"""
-        query_lower = query.lower()
-        matches = []
-        
-        for food in self.foods:
-            if any(term in food.note.lower() for term in query_lower.split()):
-                matches.append(food)
-        
-        return matches[:5]  # Limit initial matches
-    
-    def _find_graph_related_foods(self, seed_foods: List[FoodItem], query: str) -> List[FoodItem]:
-        """Use graph relationships to find related foods"""
-        related = []
-        query_lower = query.lower()
-        
-        for food in seed_foods:
-            food_node = f"FOOD:{food.name}"
-            if food_node in self.kg.graph:
-                
-                # Find foods connected by relationships
-                for neighbor in self.kg.graph.neighbors(food_node):
-                    edge_data = self.kg.graph.get_edge_data(food_node, neighbor)
-                    relation = edge_data.get('relation', '')
-                    
-                    # Follow relevant relationship paths
-                    if self._is_relevant_relation(relation, query_lower):
-                        # Get foods connected to this neighbor
-                        for second_neighbor in self.kg.graph.neighbors(neighbor):
-                            if second_neighbor.startswith('FOOD:'):
-                                food_name = second_neighbor.replace('FOOD:', '')
-                                if food_name in self.food_lookup:
-                                    related.append(self.food_lookup[food_name])
-        
-        return list(set(related))  # Remove duplicates
-    
-    def _is_relevant_relation(self, relation: str, query: str) -> bool:
-        """Determine if a graph relation is relevant to the query"""
-        relation_relevance = {
-            'iron': ['RICH_IN', 'NUTRITIONAL_ALTERNATIVE'],
-            'allergy': ['CONTAINS_ALLERGEN', 'SIMILAR_SAFETY_PROFILE'],
-            'choking': ['HAS_RISK', 'SIMILAR_SAFETY_PROFILE'],
-            'age': ['SAFE_FROM_AGE', 'SAME_AGE_GROUP'],
-            'month': ['SAFE_FROM_AGE', 'SAME_AGE_GROUP']
-        }
-        
-        for keyword, relations in relation_relevance.items():
-            if keyword in query and relation in relations:
-                return True
-        return False
+        matched_idx: Set[int] = set()
+        for term in query.lower().split():
+            matched_idx |= self._note_index.get(term.strip(_TOKEN_PUNCT), set())
+
+        # Keep food order stable and limit initial matches
+        return [self.foods[i] for i in sorted(matched_idx)[:5]]
     
-    def _generate_reasoning_paths(self, foods: List[FoodItem], query: str) -> List[str]:
-        """Generate human-readable reasoning paths"""
-        paths = []
-        
-        for food in foods[:3]:  # Top 3 foods
-            food_node = f"FOOD:{food.name}"
-            if food_node in self.kg.graph:
-                # Find the reasoning path
-                path_parts = [f"📍 {food.name}"]
-                
-                # Check direct attributes
-                if 'iron' in query.lower() and food.iron_mg > 2:
-                    path_parts.append(f"→ High iron content ({food.iron_mg}mg)")
-                
-                # Check graph relationships
-                for neighbor in self.kg.graph.neighbors(food_node):
-                    edge_data = self.kg.graph.get_edge_data(food_node, neighbor)
-                    relation = edge_data.get('relation', '')
-                    
-                    if relation == 'SAFE_FROM_AGE':
-                        neighbor_data = self.kg.graph.nodes[neighbor]
-                        path_parts.append(f"→ Safe from {neighbor_data.get('min_months')} months")
-                    elif relation == 'CONTAINS_ALLERGEN':
-                        neighbor_data = self.kg.graph.nodes[neighbor]
-                        path_parts.append(f"→ Contains {neighbor_data.get('name')} allergen")
-                
-                paths.append(" ".join(path_parts))
-        
-        return paths
     
-    def _score_foods_with_graph(self, foods: List[FoodItem], query: str) -> List[float]:
-        """Score foods considering graph relationships"""
-        scores = []
-        
-        for food in foods:
-            base_score = 0.5  # Base relevance
-            
-            # Direct text matching
-            if any(term in food.note.lower() for term in query.lower().split()):
-                base_score += 0.3
-            
-            # Graph relationship bonus
-            food_node = f"FOOD:{food.name}"
-            if food_node in self.kg.graph:
-                # Count relevant relationships
-                relevant_relations = 0
-                for neighbor in self.kg.graph.neighbors(food_node):
-                    edge_data = self.kg.graph.get_edge_data(food_node, neighbor)
-                    if self._is_relevant_relation(edge_data.get('relation', ''), query.lower()):
-                        relevant_relations += 1
-                
-                base_score += min(relevant_relations * 0.1, 0.4)  # Cap bonus at 0.4
-            
-            scores.append(base_score)
-        
-        return scores
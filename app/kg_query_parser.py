@@ -2,7 +2,7 @@ import re
 from typing import Tuple, Optional, List
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class ParsedQuery:
     food: Optional[str]
     age_months: Optional[int]
@@ -10,9 +10,40 @@ class ParsedQuery:
     raw_question: str
 
 class BabyFoodQueryParser:
+    # One alternation covering every supported age format, compiled once
+    AGE_PATTERN = re.compile(
+        r'(\d+)\s*(?:month[s]?\s*old|mo\s*old|m\s*old|month[s]?)|my\s*(\d+)\s*month'
+    )
+
+    # Handle plurals and variations
+    FOOD_VARIATIONS = {
+        'apples': 'apple',
+        'bananas': 'banana',
+        'eggs': 'egg',
+        'carrots': 'carrot',
+        'peas': 'peas',  # already plural
+    }
+
     def __init__(self, food_names: List[str]):
         self.food_names = [name.lower() for name in food_names]
-        
+
+        # Map every matchable term (name or plural variation) to its canonical name
+        self._food_lookup = {name: name for name in self.food_names}
+        for variation, canonical in self.FOOD_VARIATIONS.items():
+            if canonical in self._food_lookup:
+                self._food_lookup.setdefault(variation, canonical)
+
+        # Longest-first alternation so one linear scan finds any food name
+        if self._food_lookup:
+            self._food_pattern = re.compile(
+                '|'.join(
+                    re.escape(term)
+                    for term in sorted(self._food_lookup, key=len, reverse=True)
+                )
+            )
+        else:
+            self._food_pattern = None
+
     def parse_query(self, question: str) -> ParsedQuery:
         """Parse user question to extract food, age, and intent"""
         question_lower = question.lower()
@@ -35,45 +66,19 @@ class BabyFoodQueryParser:
     
     def _extract_age(self, question: str) -> Optional[int]:
         """Extract age in months from question"""
-        # Patterns for age extraction
-        patterns = [
-            r'(\d+)\s*month[s]?\s*old',
-            r'(\d+)\s*mo\s*old',
-            r'my\s*(\d+)\s*month',
-            r'(\d+)\s*m\s*old',
-            r'(\d+)\s*month[s]?'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, question)
-            if match:
-                return int(match.group(1))
-        
+        match = self.AGE_PATTERN.search(question)
+        if match:
+            return int(match.group(1) or match.group(2))
         return None
     
     def _extract_food(self, question: str) -> Optional[str]:
         """Extract food name from question"""
-        # Direct food name matching
-        for food_name in self.food_names:
-            if food_name in question:
-                # Return the original case version
-                for original_name in self.food_names:
-                    if original_name.lower() == food_name:
-                        return original_name.title()
-        
-        # Handle plurals and variations
-        food_variations = {
-            'apples': 'apple',
-            'bananas': 'banana',
-            'eggs': 'egg',
-            'carrots': 'carrot',
-            'peas': 'peas',  # already plural
-        }
-        
-        for variation, canonical in food_variations.items():
-            if variation in question and canonical in self.food_names:
-                return canonical.title()
-        
+        if self._food_pattern is None:
+            return None
+
+        match = self._food_pattern.search(question)
+        if match:
+            return self._food_lookup[match.group(0)].title()
         return None
     
     def _determine_query_type(self, question: str) -> str:
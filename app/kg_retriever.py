@@ -1,10 +1,91 @@
+import functools
+import re
+import sys
+from string import Template
+
 import networkx as nx
+import numpy as np
+from enum import IntFlag, auto
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
-from .models import FoodItem
+from .models import FoodItem, Risk
 from .kg_query_parser import ParsedQuery
 
-@dataclass
+class FoodFlags(IntFlag):
+    """Keyword flags over a food's name and note, computed once per food"""
+    NONE = 0
+    BOTULISM = auto()
+    CHOKING = auto()
+    ALLERGY = auto()
+    ALLERGEN = auto()
+    NITRATE = auto()
+    HONEY = auto()
+    GRAPE = auto()
+    WHOLE_NUTS = auto()
+    COW_MILK_DRINK = auto()
+    SAFE_6MO = auto()
+    SAFE_12MO = auto()
+    MENTIONS_MONTH = auto()
+    MENTIONS_AGE = auto()
+    MENTIONS_RISK = auto()
+
+# Note keywords that map 1:1 onto a flag bit
+_NOTE_KEYWORD_FLAGS = {
+    'botulism': FoodFlags.BOTULISM,
+    'choking': FoodFlags.CHOKING,
+    'allergy': FoodFlags.ALLERGY,
+    'allergen': FoodFlags.ALLERGEN,
+    'nitrate': FoodFlags.NITRATE,
+    'month': FoodFlags.MENTIONS_MONTH,
+    'age': FoodFlags.MENTIONS_AGE,
+    'risk': FoodFlags.MENTIONS_RISK,
+    'safe from 6 months': FoodFlags.SAFE_6MO,
+    'safe from 12 months': FoodFlags.SAFE_12MO,
+}
+
+def _multi_scan_pattern(keywords):
+    """One pattern that reports every keyword occurrence, overlaps included.
+
+    The lookahead makes each position report the first (longest-first)
+    keyword starting there, so nested keywords like 'month' inside
+    'safe from 6 months' are still seen.
+    """
+    alternation = '|'.join(
+        re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)
+    )
+    return re.compile(f'(?=({alternation}))')
+
+# 'whole' and 'drink' carry no flag of their own but gate compound rules
+_NOTE_SCAN = _multi_scan_pattern(list(_NOTE_KEYWORD_FLAGS) + ['whole', 'drink'])
+_NAME_SCAN = _multi_scan_pattern(
+    ['honey', 'whole grapes', 'grape', 'whole nuts',
+     'walnut', 'almond', 'peanut', "cow's milk"]
+)
+
+def compute_flags(note_lower: str, food_lower: str = '') -> FoodFlags:
+    """Run every keyword check in one scan; callers test bits instead of rescanning"""
+    note_hits = set(_NOTE_SCAN.findall(note_lower))
+    name_hits = set(_NAME_SCAN.findall(food_lower)) if food_lower else set()
+
+    flags = FoodFlags.NONE
+    for keyword in note_hits:
+        flags |= _NOTE_KEYWORD_FLAGS.get(keyword, FoodFlags.NONE)
+
+    if 'honey' in name_hits:
+        flags |= FoodFlags.HONEY
+    if 'grape' in name_hits or 'whole grapes' in name_hits:
+        flags |= FoodFlags.GRAPE
+    if 'whole nuts' in name_hits or (
+        name_hits & {'walnut', 'almond', 'peanut'} and 'whole' in note_hits
+    ):
+        flags |= FoodFlags.WHOLE_NUTS
+    if "cow's milk" in name_hits and 'drink' in note_hits:
+        flags |= FoodFlags.COW_MILK_DRINK
+    return flags
+
+# Created once per edge in the retrieval loop: slots keep the instances
+# small and frozen keeps cached subgraphs safe to share between callers
+@dataclass(slots=True, frozen=True)
 class KGFact:
     subject: str
     relation: str
@@ -12,58 +93,146 @@ class KGFact:
     source: str
     confidence: float = 1.0
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class KGSubgraph:
     facts: List[KGFact]
     graph_path: List[str]
-    safety_flags: List[str]
+    safety_flags: Risk = Risk.NONE
+
+def _fact_to_line(fact: KGFact) -> str:
+    return f"- {fact.subject} {fact.relation} {fact.object} (Source: {fact.source})"
+
+# Parsed once at import; every request substitutes into the same template
+_PROMPT_TPL = Template("""You are a pediatric nutrition expert. Answer the user's question using ONLY the provided facts.
+
+FACTS ABOUT $food:
+$facts
+
+SAFETY FLAGS: $flags
+
+RULES:
+1. Use ONLY the facts provided above
+2. If uncertain or missing information, clearly state "I don't have enough information"
+3. Always include source citations
+4. Format response as:
+   ✅/⚠️/❌ [Safety verdict]
+   🥄 Prep: [Preparation if available]
+   ⚠️ Note: [Warnings if any]
+   📚 Sources: [List sources]
+
+USER QUESTION: $question
+
+RESPONSE:""")
+
+# Risk objects on HAS_RISK edges, mapped to their bit
+_RISK_BITS = {
+    'botulism': Risk.BOTULISM,
+    'choking': Risk.CHOKING,
+    'allergy': Risk.ALLERGY,
+    'anemia': Risk.ANEMIA,
+    'nitrate': Risk.NITRATE,
+}
 
 class KnowledgeGraphRetriever:
     def __init__(self, foods: List[FoodItem]):
         self.foods = foods
-        self.food_lookup = {food.name.lower(): food for food in foods}
+        # Interned keys make the dict probes compare by identity first
+        self.food_lookup = {sys.intern(food.name.lower()): food for food in foods}
+        # One keyword pass per food, shared by graph build and any consumer
+        self.flags_by_name = {
+            food.name: compute_flags(food.note.lower(), food.name.lower())
+            for food in foods
+        }
         self.kg = self._build_knowledge_graph()
-        
+        self._build_csr_edges()
+        # Retrieval is deterministic in (food, age_months); cache per instance
+        # so repeat questions skip the traversal entirely
+        self._retrieve_cached = functools.lru_cache(maxsize=1024)(
+            self._retrieve_subgraph_uncached
+        )
+
+    def _build_csr_edges(self):
+        """Flatten food out-edges into CSR-style parallel arrays.
+
+        The graph never mutates after build, so retrieval can slice flat
+        int32 arrays instead of chasing networkx dict chains per edge.
+        Relation/object/source strings are interned in small tables.
+        """
+        self._food_ids: Dict[str, int] = {}
+        self._rel_tab: List[str] = []
+        self._obj_tab: List[str] = []
+        self._src_tab: List[str] = []
+        rel_intern: Dict[str, int] = {}
+        obj_intern: Dict[str, int] = {}
+        src_intern: Dict[str, int] = {}
+
+        indptr = [0]
+        rel_ids, obj_ids, src_ids = [], [], []
+
+        def intern(value, table, index):
+            vid = index.get(value)
+            if vid is None:
+                vid = len(table)
+                index[value] = vid
+                # sys.intern: these come from a tiny fixed vocabulary, so
+                # later equality checks and dict keys compare by identity
+                table.append(sys.intern(value))
+            return vid
+
+        for food in self.foods:
+            food_node = f"FOOD:{food.name}"
+            self._food_ids[sys.intern(food.name)] = len(indptr) - 1
+            for neighbor in self.kg.neighbors(food_node):
+                edge_data = self.kg.get_edge_data(food_node, neighbor)
+                obj = neighbor.split(':')[1] if ':' in neighbor else neighbor
+                rel_ids.append(intern(edge_data['relation'], self._rel_tab, rel_intern))
+                obj_ids.append(intern(obj, self._obj_tab, obj_intern))
+                src_ids.append(intern(edge_data['source'], self._src_tab, src_intern))
+            indptr.append(len(rel_ids))
+
+        self._indptr = np.array(indptr, dtype=np.int32)
+        self._rel_id = np.array(rel_ids, dtype=np.int32)
+        self._obj_id = np.array(obj_ids, dtype=np.int32)
+        self._src_id = np.array(src_ids, dtype=np.int32)
+
     def _build_knowledge_graph(self) -> nx.DiGraph:
         """Build knowledge graph from food data with enhanced safety rules"""
         G = nx.DiGraph()
-        
+
         for food in self.foods:
             food_node = f"FOOD:{food.name}"
             G.add_node(food_node, type="food", data=food)
-            
-            # Extract age safety from note with more specific rules
-            note_lower = food.note.lower()
-            food_lower = food.name.lower()
-            
+
+            flags = self.flags_by_name[food.name]
+
             # Hard-coded critical safety rules
-            if 'honey' in food_lower:
+            if flags & FoodFlags.HONEY:
                 G.add_edge(food_node, "AGE:12", relation="SAFE_AT", source="AAP Critical Guidelines")
                 G.add_edge(food_node, "RISK:botulism", relation="HAS_RISK", source="AAP Critical Guidelines")
-            elif 'whole grapes' in food_lower or 'grape' in food_lower:
+            elif flags & FoodFlags.GRAPE:
                 G.add_edge(food_node, "AGE:48", relation="SAFE_AT", source="AAP Choking Guidelines")
                 G.add_edge(food_node, "RISK:choking", relation="HAS_RISK", source="AAP Choking Guidelines")
-            elif 'whole nuts' in food_lower or (any(nut in food_lower for nut in ['walnut', 'almond', 'peanut']) and 'whole' in note_lower):
+            elif flags & FoodFlags.WHOLE_NUTS:
                 G.add_edge(food_node, "AGE:48", relation="SAFE_AT", source="AAP Choking Guidelines")
                 G.add_edge(food_node, "RISK:choking", relation="HAS_RISK", source="AAP Choking Guidelines")
-            elif "cow's milk" in food_lower and 'drink' in note_lower:
+            elif flags & FoodFlags.COW_MILK_DRINK:
                 G.add_edge(food_node, "AGE:12", relation="SAFE_AT", source="AAP Nutrition Guidelines")
                 G.add_edge(food_node, "RISK:anemia", relation="HAS_RISK", source="AAP Nutrition Guidelines")
-            
+
             # Extract from note content
-            elif 'safe from 6 months' in note_lower:
+            elif flags & FoodFlags.SAFE_6MO:
                 G.add_edge(food_node, "AGE:6", relation="SAFE_AT", source="AAP/CDC")
-            elif 'safe from 12 months' in note_lower:
+            elif flags & FoodFlags.SAFE_12MO:
                 G.add_edge(food_node, "AGE:12", relation="SAFE_AT", source="AAP/CDC")
-            
+
             # Extract risks with enhanced detection
-            if 'choking' in note_lower:
+            if flags & FoodFlags.CHOKING:
                 G.add_edge(food_node, "RISK:choking", relation="HAS_RISK", source="Safety Database")
-            if 'allergy' in note_lower or 'allergen' in note_lower:
+            if flags & (FoodFlags.ALLERGY | FoodFlags.ALLERGEN):
                 G.add_edge(food_node, "RISK:allergy", relation="HAS_RISK", source="Allergy Guidelines")
-            if 'nitrate' in note_lower:
+            if flags & FoodFlags.NITRATE:
                 G.add_edge(food_node, "RISK:nitrate", relation="HAS_RISK", source="CDC Guidelines")
-            if 'botulism' in note_lower:
+            if flags & FoodFlags.BOTULISM:
                 G.add_edge(food_node, "RISK:botulism", relation="HAS_RISK", source="AAP Guidelines")
             
             # Extract nutrients
@@ -81,67 +250,62 @@ class KnowledgeGraphRetriever:
     def retrieve_subgraph(self, parsed_query: ParsedQuery) -> KGSubgraph:
         """Retrieve relevant subgraph based on parsed query"""
         if not parsed_query.food:
-            return KGSubgraph(facts=[], graph_path=[], safety_flags=[])
-        
-        food_node = f"FOOD:{parsed_query.food}"
-        if food_node not in self.kg:
-            return KGSubgraph(facts=[], graph_path=[], safety_flags=[])
-        
+            return KGSubgraph(facts=[], graph_path=[])
+        return self._retrieve_cached(parsed_query.food, parsed_query.age_months)
+
+    def _retrieve_subgraph_uncached(self, food: str, age_months: Optional[int]) -> KGSubgraph:
+        # Parsed food names come from a small fixed vocabulary, so interning
+        # the probe key turns the dict lookup into an identity compare
+        food_idx = self._food_ids.get(sys.intern(food))
+        if food_idx is None:
+            return KGSubgraph(facts=[], graph_path=[])
+
         facts = []
-        graph_path = [parsed_query.food]
-        safety_flags = []
-        
-        # Get all edges from the food node
-        for neighbor in self.kg.neighbors(food_node):
-            edge_data = self.kg.get_edge_data(food_node, neighbor)
-            relation = edge_data['relation']
-            source = edge_data['source']
-            
+        graph_path = [food]
+        safety_flags = Risk.NONE
+
+        # Walk this food's CSR slice
+        for k in range(self._indptr[food_idx], self._indptr[food_idx + 1]):
+            relation = self._rel_tab[self._rel_id[k]]
+            obj = self._obj_tab[self._obj_id[k]]
+
             fact = KGFact(
-                subject=parsed_query.food,
+                subject=food,
                 relation=relation,
-                object=neighbor.split(':')[1] if ':' in neighbor else neighbor,
-                source=source
+                object=obj,
+                source=self._src_tab[self._src_id[k]]
             )
             facts.append(fact)
-            graph_path.append(f"{relation} → {fact.object}")
-            
+            graph_path.append(f"{relation} → {obj}")
+
             # Check for safety flags
             if relation == "HAS_RISK":
-                safety_flags.append(fact.object)
-            elif relation == "SAFE_AT" and parsed_query.age_months:
-                min_age = int(fact.object)
-                if parsed_query.age_months < min_age:
-                    safety_flags.append(f"too_young_for_{parsed_query.food}")
-        
+                safety_flags |= _RISK_BITS.get(obj, Risk.NONE)
+            elif relation == "SAFE_AT" and age_months:
+                min_age = int(obj)
+                if age_months < min_age:
+                    safety_flags |= Risk.TOO_YOUNG
+
         return KGSubgraph(facts=facts, graph_path=graph_path, safety_flags=safety_flags)
     
     def generate_llm_prompt(self, parsed_query: ParsedQuery, subgraph: KGSubgraph) -> str:
         """Generate LLM prompt with retrieved facts"""
-        facts_text = "\n".join([
-            f"- {fact.subject} {fact.relation} {fact.object} (Source: {fact.source})"
-            for fact in subgraph.facts
-        ])
-        
-        system_prompt = f"""You are a pediatric nutrition expert. Answer the user's question using ONLY the provided facts.
-
-FACTS ABOUT {parsed_query.food.upper() if parsed_query.food else 'THE FOOD'}:
-{facts_text}
-
-SAFETY FLAGS: {', '.join(subgraph.safety_flags) if subgraph.safety_flags else 'None'}
-
-RULES:
-1. Use ONLY the facts provided above
-2. If uncertain or missing information, clearly state "I don't have enough information"
-3. Always include source citations
-4. Format response as:
-   ✅/⚠️/❌ [Safety verdict]
-   🥄 Prep: [Preparation if available]
-   ⚠️ Note: [Warnings if any]
-   📚 Sources: [List sources]
+        facts_text = "\n".join(map(_fact_to_line, subgraph.facts))
 
-USER QUESTION: {parsed_query.raw_question}
+        # Render the bitmask to words only here, at the prompt boundary
+        flag_names = [
+            member.name.lower() for member in Risk
+            if member and subgraph.safety_flags & member
+        ]
+        if Risk.TOO_YOUNG in subgraph.safety_flags and parsed_query.food:
+            flag_names = [
+                f"too_young_for_{parsed_query.food}" if name == 'too_young' else name
+                for name in flag_names
+            ]
 
-RESPONSE:"""
-        
-        return system_prompt
+        return _PROMPT_TPL.substitute(
+            food=parsed_query.food.upper() if parsed_query.food else 'THE FOOD',
+            facts=facts_text,
+            flags=', '.join(flag_names) if flag_names else 'None',
+            question=parsed_query.raw_question,
+        )
@@ -1,7 +1,23 @@
+from dataclasses import dataclass
+from enum import IntFlag, auto
 from pydantic import BaseModel
 from typing import List, Optional
 
-class FoodItem(BaseModel):
+class Risk(IntFlag):
+    """Safety flags carried on a retrieved subgraph as one bitmask"""
+    NONE = 0
+    BOTULISM = auto()
+    CHOKING = auto()
+    ALLERGY = auto()
+    ANEMIA = auto()
+    NITRATE = auto()
+    TOO_YOUNG = auto()
+
+# Internal hot-path model: created once per row, read in every retrieval
+# loop. A slotted dataclass keeps attribute access a fixed slot fetch;
+# pydantic v2 still validates/serializes it inside the response models.
+@dataclass(slots=True, frozen=True)
+class FoodItem:
     name: str
     category: str
     kcal_100g: float
@@ -1,33 +1,54 @@
+import re
+
 from typing import List, Tuple
 from .models import FoodItem, SafetyAlert, RAGAdvantage
+from .kg_retriever import FoodFlags, compute_flags
+
+# Baby-context wording checked once per query
+_BABY_CONTEXT_RE = re.compile(r"baby|infant|month")
 
 class RAGAdvantageAnalyzer:
     """Analyzes and highlights advantages of RAG over generic ChatGPT responses"""
-    
+
+    def __init__(self):
+        # Keyword flags computed once per food name and reused across calls
+        self._flags_by_name = {}
+
+    def _food_flags(self, food: FoodItem) -> FoodFlags:
+        flags = self._flags_by_name.get(food.name)
+        if flags is None:
+            flags = compute_flags(food.note.lower(), food.name.lower())
+            self._flags_by_name[food.name] = flags
+        return flags
+
     def analyze_safety_critical_info(self, foods: List[FoodItem], query: str) -> List[SafetyAlert]:
         """Identify safety-critical information that ChatGPT might miss or downplay"""
         alerts = []
         query_lower = query.lower()
-        
+
         for food in foods:
-            note_lower = food.note.lower()
-            
+            # Only the top 3 alerts are returned; stop scanning once we
+            # already have them
+            if len(alerts) >= 3:
+                break
+            flags = self._food_flags(food)
+
             # Critical safety alerts
-            if 'botulism' in note_lower:
+            if flags & FoodFlags.BOTULISM:
                 alerts.append(SafetyAlert(
                     level="CRITICAL",
                     message=f"⚠️ {food.name}: NEVER give honey to babies under 12 months - risk of infant botulism",
                     source="AAP/CDC Guidelines"
                 ))
             
-            if 'choking' in note_lower and any(word in query_lower for word in ['baby', 'infant', 'month']):
+            if flags & FoodFlags.CHOKING and _BABY_CONTEXT_RE.search(query_lower):
                 alerts.append(SafetyAlert(
                     level="WARNING", 
                     message=f"🚨 {food.name}: Specific choking hazard - requires careful preparation",
                     source="AAP Choking Prevention Guidelines"
                 ))
             
-            if 'allergy' in note_lower:
+            if flags & FoodFlags.ALLERGY:
                 alerts.append(SafetyAlert(
                     level="INFO",
                     message=f"🔍 {food.name}: Known allergen - introduce carefully and watch for reactions",
@@ -39,23 +60,25 @@ class RAGAdvantageAnalyzer:
     def generate_rag_advantages(self, foods: List[FoodItem], query: str) -> RAGAdvantage:
         """Highlight specific advantages of this RAG system"""
         
-        # Check for evidence-based sources
-        has_medical_sources = any(
-            any(source in food.note for source in ['AAP', 'CDC', 'WHO']) 
-            for food in foods
-        )
-        
-        # Check for safety verification
-        safety_checked = any(
-            any(term in food.note.lower() for term in ['choking', 'allergy', 'month', 'risk'])
-            for food in foods
-        )
-        
-        # Check for age-appropriate guidance
-        age_appropriate = any(
-            'month' in food.note.lower() or 'age' in food.note.lower()
-            for food in foods
-        )
+        # One pass over the foods accumulates all three checks; stop as
+        # soon as every answer is known
+        safety_check_flags = (FoodFlags.CHOKING | FoodFlags.ALLERGY
+                              | FoodFlags.MENTIONS_MONTH | FoodFlags.MENTIONS_RISK)
+        age_flags = FoodFlags.MENTIONS_MONTH | FoodFlags.MENTIONS_AGE
+
+        has_medical_sources = safety_checked = age_appropriate = False
+        for food in foods:
+            flags = self._food_flags(food)
+            if not has_medical_sources:
+                # Stays case-sensitive on the raw note: 'WHO' the agency,
+                # not 'who' the pronoun
+                has_medical_sources = any(
+                    source in food.note for source in ('AAP', 'CDC', 'WHO')
+                )
+            safety_checked = safety_checked or bool(flags & safety_check_flags)
+            age_appropriate = age_appropriate or bool(flags & age_flags)
+            if has_medical_sources and safety_checked and age_appropriate:
+                break
         
         medical_guidelines = "AAP/CDC/WHO" if has_medical_sources else "General guidelines"
         
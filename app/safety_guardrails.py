@@ -25,7 +25,17 @@ class SafetyGuardrailEngine:
         
         # Dynamic safety rules extracted from KG
         self.dynamic_safety_rules = {}
-    
+
+        # Lowercased lookup structures built once so the per-request check
+        # is a dict hit (plus a tiny substring fallback) instead of a scan
+        # that re-lowercases every block name
+        self._blocks_by_food_lower = {
+            block.food.lower(): block for block in self.critical_safety_blocks
+        }
+        self._block_tokens = [
+            (block.food.lower(), block) for block in self.critical_safety_blocks
+        ]
+
     def check_safety_violations(self, parsed_query: ParsedQuery, subgraph: KGSubgraph) -> Optional[SafetyBlock]:
         """Check if query violates any critical safety rules"""
         
@@ -48,9 +58,14 @@ class SafetyGuardrailEngine:
         """Check against hard-coded critical safety blocks"""
         food_lower = parsed_query.food.lower()
         age = parsed_query.age_months
-        
-        for block in self.critical_safety_blocks:
-            if block.food.lower() in food_lower or food_lower in block.food.lower():
+
+        # Exact match first - the common case is a single dict lookup
+        block = self._blocks_by_food_lower.get(food_lower)
+        if block is not None and age < block.age_limit_months:
+            return block
+
+        for block_food_lower, block in self._block_tokens:
+            if block_food_lower in food_lower or food_lower in block_food_lower:
                 if age < block.age_limit_months:
                     return block
         return None
@@ -122,5 +137,10 @@ class SafetyGuardrailEngine:
         
         # Always include authoritative source
         response_parts.append(f"📚 Sources: {violation.source}")
-        
+
         return "\n".join(response_parts)
+
+
+# Shared engine instance: the block list is static, so every request can
+# reuse the same precomputed lookup structures
+_ENGINE = SafetyGuardrailEngine()
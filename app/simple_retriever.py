@@ -1,27 +1,246 @@
+import hashlib
+import joblib
 import numpy as np
+import re
+from collections import Counter
+from pathlib import Path
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from rank_bm25 import BM25Okapi
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from .models import FoodItem, Citation
 
+# Prebuilt indexes persist here (same directory the advanced retriever
+# uses); workers mmap one shared copy instead of each rebuilding
+_CACHE_DIR = Path('.cache')
+
+# Nutrient keyword groups fused into one pattern; one scan classifies a query
+_NUTRIENT_RE = re.compile(
+    r"(?P<protein>protein|growth|muscle)"
+    r"|(?P<iron>iron|anemia|mineral)"
+    r"|(?P<vitamin_c>vitamin c|immune|immunity)"
+    r"|(?P<vitamin_a>vitamin a|vision|eye)"
+    r"|(?P<fiber>fiber|digestion|digestive)"
+    r"|(?P<calories>calories|energy|weight gain)"
+)
+
+# Soft cache hits: a query whose TF-IDF vector is at least this close to
+# a cached one reuses that result
+_QUERY_SIM_THRESHOLD = 0.95
+_QUERY_CACHE_MAX = 512
+
+# Icon prefixes stripped from action steps in one pass
+_ICON_RE = re.compile(r"(?:👍|🚫|⚠️)\s*\*\*Next step:\*\*")
+
+# Per-food dispatch flags for the action-step helper: each food's name
+# and note are scanned once at init and reduced to a bitmask, so the
+# per-call safety checks are bitwise tests instead of substring scans
+_FLAG_HONEY = 1
+_FLAG_CHOKING = 2
+_FLAG_GRAPE = 4
+
+# Starter-query phrases fused into one pattern for the same reason
+_FIRST_FOOD_QUERY_RE = re.compile(r"first food|start")
+
+# Age mentions and warning keywords fused into one pattern each; a
+# single scan replaces the chain of substring tests per note
+_AGE_RE = re.compile(r"(?P<m6>6 months)|(?P<m12>12 months)")
+_WARNING_RE = re.compile(r"(?P<choking>choking)|(?P<allergy>allergy)|(?P<iron>iron)|(?P<spinach>spinach)")
+
+# Static answer tables for the helpers below, built once at import
+# First-food suggestions for starter queries
+_FIRST_FOOD_ACTIONS = {
+    'banana': "👍 **Next step:** Perfect starter! Try mashed banana mixed into baby cereal at breakfast.",
+    'apple': "👍 **Next step:** Steam and mash smooth. Great first fruit to introduce.",
+    'sweet potato': "👍 **Next step:** Steam until very soft, mash smooth. Excellent first vegetable.",
+    'rice cereal': "👍 **Next step:** Mix thin with breast milk. Traditional first food choice.",
+    'avocado': "👍 **Next step:** Mash ripe avocado smooth. Rich, creamy first food."
+}
+
+# Food-specific practical actions
+_ACTIONS = {
+    'banana': "👍 **Next step:** Try at breakfast mashed into oatmeal or as finger food strips.",
+    'apple': "👍 **Next step:** Steam and mash, or try as soft cooked pieces for texture practice.",
+    'chicken': "👍 **Next step:** Cook thoroughly, shred finely, and mix with favorite vegetables.",
+    'salmon': "👍 **Next step:** Cook well, check carefully for bones, and flake into small pieces.",
+    'egg': "👍 **Next step:** Scramble well-cooked and try at breakfast. Great protein source.",
+    'yogurt': "👍 **Next step:** Offer plain whole-milk yogurt as snack or mixed with fruit.",
+    'spinach': "👍 **Next step:** Steam and puree, then mix into pasta or rice dishes.",
+    'rice cereal': "👍 **Next step:** Start thin, gradually thicken as baby adapts to textures."
+}
+
+# Food-specific reasoning for parents
+_EXPLANATIONS = {
+    'banana': 'Bananas are gentle first foods - naturally sweet, easy to mash, and rich in potassium for healthy muscle development',
+    'avocado': 'Avocados provide healthy fats essential for brain development during this critical growth period',
+    'apple': 'Apples introduce natural sweetness and fiber, helping develop taste preferences for healthy foods',
+    'sweet potato': 'Sweet potatoes are naturally sweet and packed with beta-carotene for healthy vision development',
+    'chicken': 'Chicken provides complete protein with all amino acids needed for your baby\'s rapid growth',
+    'salmon': 'Salmon offers omega-3s crucial for brain development during the first year of life',
+    'egg': 'Eggs are nutritional powerhouses and early introduction may help prevent allergies later',
+    'spinach': 'Leafy greens provide iron and folate for healthy blood development, though portions should be small for young babies'
+}
+
 class SimpleHybridRetriever:
+    # FoodItem attribute backing each nutrient query
+    NUTRIENT_ATTRS = {
+        'protein': 'protein_g',
+        'iron': 'iron_mg',
+        'vitamin_c': 'vit_c_mg',
+        'vitamin_a': 'vit_a_ug',
+        'fiber': 'fiber_g',
+        'calories': 'kcal_100g',
+    }
+
+    # Minimum amounts for a food to count as a significant source
+    MIN_THRESHOLDS = {
+        'protein': 5.0,  # At least 5g protein
+        'iron': 1.0,     # At least 1mg iron
+        'vitamin_c': 10.0, # At least 10mg vitamin C
+        'vitamin_a': 50.0, # At least 50µg vitamin A
+        'fiber': 2.0,    # At least 2g fiber
+        'calories': 50.0  # At least 50 kcal
+    }
+
     def __init__(self, foods: List[FoodItem], descriptions: List[str]):
         self.foods = foods
         self.descriptions = descriptions
-        
-        # Build BM25 index
-        tokenized_descriptions = [desc.lower().split() for desc in descriptions]
-        self.bm25 = BM25Okapi(tokenized_descriptions)
-        
-        # Build TF-IDF index (simpler alternative to sentence transformers)
+
+        # Nutrient contents are static per catalog: build the value arrays
+        # and descending orderings once instead of sorting per query
+        self._nutrient_values = {
+            nutrient: np.array([getattr(food, attr) for food in foods], dtype=np.float32)
+            for nutrient, attr in self.NUTRIENT_ATTRS.items()
+        }
+        self._nutrient_order = {
+            nutrient: np.argsort(-values, kind='stable')
+            for nutrient, values in self._nutrient_values.items()
+        }
+        self._nutrient_range = {
+            nutrient: (float(values.min()), float(values.max())) if len(values) else (0.0, 0.0)
+            for nutrient, values in self._nutrient_values.items()
+        }
+        # Thresholds are fixed too, so the "significant sources, highest
+        # first" index list per nutrient is fully static
+        self._nutrient_above = {
+            nutrient: order[self._nutrient_values[nutrient][order] >= self.MIN_THRESHOLDS.get(nutrient, 0)]
+            for nutrient, order in self._nutrient_order.items()
+        }
+
+        # Both heavy indexes (BM25 CSR and the fitted TF-IDF) are memoized
+        # on disk under a hash of the descriptions, mirroring the advanced
+        # retriever's cache. Loading with mmap_mode='r' means every uvicorn
+        # worker shares one page-cache copy of the index arrays instead of
+        # each rebuilding and holding its own.
+        cache_key = hashlib.blake2b(
+            ('||'.join(descriptions) + '|analyzer-tokens').encode()
+        ).hexdigest()[:16]
+        index_path = _CACHE_DIR / f'simple_index_{cache_key}.joblib'
+        if index_path.exists():
+            (self.tfidf_vectorizer, self.tfidf_matrix,
+             self._bm25_vocab, self._bm25_csr) = joblib.load(index_path, mmap_mode='r')
+        else:
+            self._build_indexes(descriptions)
+            _CACHE_DIR.mkdir(exist_ok=True)
+            joblib.dump(
+                (self.tfidf_vectorizer, self.tfidf_matrix,
+                 self._bm25_vocab, self._bm25_csr),
+                index_path,
+            )
+
+        # Query-time tokenizer shared with the TF-IDF side, so queries see
+        # the exact tokens the BM25 index was built from
+        self._analyzer = self.tfidf_vectorizer.build_analyzer()
+
+        # Per-term posting lists (views into the CSR arrays): a short
+        # query then touches only its own nonzeros, and out-of-vocabulary
+        # tokens cost one failed dict probe
+        indptr = self._bm25_csr.indptr
+        self._postings = {
+            term: self._bm25_csr.indices[indptr[term_id]:indptr[term_id + 1]]
+            for term, term_id in self._bm25_vocab.items()
+        }
+        self._weights = {
+            term: self._bm25_csr.data[indptr[term_id]:indptr[term_id + 1]]
+            for term, term_id in self._bm25_vocab.items()
+        }
+
+        # Lowered name/category/note per food, computed once so the
+        # answer helpers read a dict entry instead of re-lowering the
+        # same immutable strings on every call
+        self._name_lower = {food.name: food.name.lower() for food in foods}
+        self._category_lower = {food.name: food.category.lower() for food in foods}
+        self._note_lower = {food.name: food.note.lower() for food in foods}
+
+        # Safety-dispatch bitmask per food (FoodItem is frozen, so the
+        # flags live in a side table like the lowered strings above)
+        self._action_flags = {
+            food.name: (
+                (_FLAG_HONEY if 'honey' in self._name_lower[food.name] else 0)
+                | (_FLAG_CHOKING if 'choking' in self._note_lower[food.name] else 0)
+                | (_FLAG_GRAPE if 'grape' in self._name_lower[food.name] else 0)
+            )
+            for food in foods
+        }
+
+        # Two-tier query cache: exact hits key on the normalized query,
+        # soft hits reuse the result of a near-identical cached query
+        # vector. Fresh per instance, so a data reload starts clean.
+        self._query_cache = {}        # (query, top_k) -> (foods, scores)
+        self._query_cache_keys = []   # insertion order, aligned with vectors
+        self._query_vectors = []      # cached sparse query vectors
+
+    def _build_indexes(self, descriptions: List[str]) -> None:
+        """Build the BM25 and TF-IDF indexes from scratch (cache miss path)"""
+        # Instantiate the TF-IDF vectorizer first so its analyzer can feed
+        # the BM25 builder too: the corpus is tokenized once and both
+        # indexes agree on lowercasing, punctuation and stop words
         self.tfidf_vectorizer = TfidfVectorizer(
             stop_words='english',
             ngram_range=(1, 2),
-            max_features=1000
+            max_features=1000,
+            # float32 halves the bytes per nonzero in the cosine matmul
+            dtype=np.float32
+        )
+        analyzer = self.tfidf_vectorizer.build_analyzer()
+
+        # Build BM25 index: a sparse term-by-document matrix of
+        # precomputed score contributions, so scoring a query is one row
+        # selection + column sum instead of a Python loop per document
+        tokenized_descriptions = [analyzer(desc) for desc in descriptions]
+        k1, b = 1.5, 0.75
+        n_docs = len(descriptions)
+        doc_len = np.array([len(tokens) for tokens in tokenized_descriptions], dtype=np.float64)
+        avgdl = doc_len.mean() if n_docs else 0.0
+
+        self._bm25_vocab: Dict[str, int] = {}
+        term_ids, doc_ids, term_freqs = [], [], []
+        doc_freq: Dict[int, int] = {}
+        for doc_idx, tokens in enumerate(tokenized_descriptions):
+            for term, freq in Counter(tokens).items():
+                term_id = self._bm25_vocab.setdefault(term, len(self._bm25_vocab))
+                term_ids.append(term_id)
+                doc_ids.append(doc_idx)
+                term_freqs.append(freq)
+                doc_freq[term_id] = doc_freq.get(term_id, 0) + 1
+
+        term_ids = np.array(term_ids, dtype=np.int32)
+        doc_ids = np.array(doc_ids, dtype=np.int32)
+        term_freqs = np.array(term_freqs, dtype=np.float64)
+        df = np.zeros(len(self._bm25_vocab), dtype=np.float64)
+        for term_id, count in doc_freq.items():
+            df[term_id] = count
+        idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+        k_d = k1 * (1 - b + b * doc_len / avgdl) if n_docs else doc_len
+        contributions = idf[term_ids] * term_freqs * (k1 + 1) / (term_freqs + k_d[doc_ids])
+        self._bm25_csr = sparse.csr_matrix(
+            (contributions.astype(np.float32), (term_ids, doc_ids)),
+            shape=(len(self._bm25_vocab), n_docs),
         )
+
+        # Fit TF-IDF on the same corpus (simpler alternative to sentence
+        # transformers)
         self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(descriptions)
-    
+
     def retrieve(self, query: str, top_k: int = 3) -> Tuple[List[FoodItem], List[float]]:
         """Hybrid retrieval combining BM25 and TF-IDF with nutrient-aware ranking"""
         
@@ -34,108 +253,164 @@ class SimpleHybridRetriever:
         else:
             # Use standard hybrid retrieval
             return self._standard_retrieve(query, top_k)
-    
+
+    def retrieve_batch(self, queries: List[str], top_ks: List[int]) -> List[Tuple[List[FoodItem], List[float]]]:
+        """Answer several queries with one TF-IDF transform and matmul.
+
+        sklearn tokenizes and multiplies the whole batch in C, so
+        coalesced concurrent queries amortize the per-call overhead.
+        """
+        results: List[Tuple[List[FoodItem], List[float]]] = [None] * len(queries)
+        standard_idx = []
+        for i, (query, top_k) in enumerate(zip(queries, top_ks)):
+            nutrient_query = self._detect_nutrient_query(query.lower())
+            if nutrient_query:
+                results[i] = self._nutrient_focused_retrieve(query, nutrient_query, top_k)
+            else:
+                standard_idx.append(i)
+
+        if len(standard_idx) == 1:
+            # A lone query goes through the cached single-query path
+            i = standard_idx[0]
+            results[i] = self._standard_retrieve(queries[i], top_ks[i])
+        elif standard_idx:
+            query_vectors = self.tfidf_vectorizer.transform([queries[i] for i in standard_idx])
+            tfidf_scores = (query_vectors @ self.tfidf_matrix.T).toarray()
+            for row, i in enumerate(standard_idx):
+                results[i] = self._combine_scores(
+                    self._bm25_scores(queries[i]), tfidf_scores[row], top_ks[i])
+        return results
+
     def _detect_nutrient_query(self, query_lower: str) -> str:
         """Detect if query is asking for specific nutrients"""
-        nutrient_keywords = {
-            'protein': ['protein', 'growth', 'muscle'],
-            'iron': ['iron', 'anemia', 'mineral'],
-            'vitamin_c': ['vitamin c', 'immune', 'immunity'],
-            'vitamin_a': ['vitamin a', 'vision', 'eye'],
-            'fiber': ['fiber', 'digestion', 'digestive'],
-            'calories': ['calories', 'energy', 'weight gain']
-        }
-        
-        for nutrient, keywords in nutrient_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                return nutrient
+        hits = {match.lastgroup for match in _NUTRIENT_RE.finditer(query_lower)}
+        if hits:
+            # Preserve the historical priority order on multi-nutrient queries
+            for nutrient in self.NUTRIENT_ATTRS:
+                if nutrient in hits:
+                    return nutrient
         return None
     
     def _nutrient_focused_retrieve(self, query: str, nutrient: str, top_k: int) -> Tuple[List[FoodItem], List[float]]:
         """Retrieve foods ranked by specific nutrient content"""
-        
-        # Sort foods by the requested nutrient
-        nutrient_map = {
-            'protein': lambda food: food.protein_g,
-            'iron': lambda food: food.iron_mg,
-            'vitamin_c': lambda food: food.vit_c_mg,
-            'vitamin_a': lambda food: food.vit_a_ug,
-            'fiber': lambda food: food.fiber_g,
-            'calories': lambda food: food.kcal_100g
-        }
-        
-        if nutrient in nutrient_map:
-            # Sort by nutrient content (highest first)
-            sorted_foods = sorted(self.foods, key=nutrient_map[nutrient], reverse=True)
-            
-            # Take top foods with significant amounts of the nutrient
-            min_thresholds = {
-                'protein': 5.0,  # At least 5g protein
-                'iron': 1.0,     # At least 1mg iron
-                'vitamin_c': 10.0, # At least 10mg vitamin C
-                'vitamin_a': 50.0, # At least 50µg vitamin A
-                'fiber': 2.0,    # At least 2g fiber
-                'calories': 50.0  # At least 50 kcal
-            }
-            
-            threshold = min_thresholds.get(nutrient, 0)
-            high_nutrient_foods = [food for food in sorted_foods 
-                                 if nutrient_map[nutrient](food) >= threshold]
-            
-            # If we don't have enough high-nutrient foods, include all sorted foods
-            if len(high_nutrient_foods) < top_k:
-                top_foods = sorted_foods[:top_k]
-            else:
-                top_foods = high_nutrient_foods[:top_k]
-            
-            # Generate scores based on nutrient content (normalized 0-1)
-            max_value = max(nutrient_map[nutrient](food) for food in sorted_foods)
-            min_value = min(nutrient_map[nutrient](food) for food in sorted_foods)
-            
-            if max_value > min_value:
-                top_scores = [(nutrient_map[nutrient](food) - min_value) / (max_value - min_value) 
-                             for food in top_foods]
-            else:
-                top_scores = [1.0] * len(top_foods)
-            
-            return top_foods, top_scores
-        
-        # Fallback to standard retrieval
-        return self._standard_retrieve(query, top_k)
+        values = self._nutrient_values.get(nutrient)
+        if values is None or len(values) == 0:
+            # Fallback to standard retrieval
+            return self._standard_retrieve(query, top_k)
+
+        # Take top foods with significant amounts of the nutrient, from the
+        # static precomputed ordering — the query path is pure slicing
+        high_nutrient_idx = self._nutrient_above[nutrient]
+
+        # If we don't have enough high-nutrient foods, include all sorted foods
+        if len(high_nutrient_idx) < top_k:
+            top_idx = self._nutrient_order[nutrient][:top_k]
+        else:
+            top_idx = high_nutrient_idx[:top_k]
+
+        top_foods = [self.foods[i] for i in top_idx]
+
+        # Generate scores based on nutrient content (normalized 0-1)
+        min_value, max_value = self._nutrient_range[nutrient]
+
+        if max_value > min_value:
+            top_scores = [(values[i] - min_value) / (max_value - min_value)
+                          for i in top_idx]
+        else:
+            top_scores = [1.0] * len(top_idx)
+
+        return top_foods, top_scores
     
     def _standard_retrieve(self, query: str, top_k: int) -> Tuple[List[FoodItem], List[float]]:
         """Standard hybrid retrieval combining BM25 and TF-IDF"""
-        
-        # BM25 scores
-        tokenized_query = query.lower().split()
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        
-        # TF-IDF scores
+
+        # Exact cache hit on the normalized query
+        cache_key = (query.strip().lower(), top_k)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            top_foods, top_scores = cached
+            return list(top_foods), list(top_scores)
+
         query_vector = self.tfidf_vectorizer.transform([query])
-        tfidf_scores = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
-        
+
+        # Soft hit: a paraphrase whose TF-IDF vector is nearly identical
+        # to a cached query gets that query's result
+        if self._query_vectors:
+            sims = (query_vector @ sparse.vstack(self._query_vectors).T).toarray().ravel()
+            best = int(np.argmax(sims))
+            if sims[best] >= _QUERY_SIM_THRESHOLD and self._query_cache_keys[best][1] == top_k:
+                top_foods, top_scores = self._query_cache[self._query_cache_keys[best]]
+                return list(top_foods), list(top_scores)
+
+        top_foods, top_scores = self._score_and_rank(query, query_vector, top_k)
+
+        if len(self._query_cache_keys) >= _QUERY_CACHE_MAX:
+            oldest = self._query_cache_keys.pop(0)
+            self._query_cache.pop(oldest, None)
+            self._query_vectors.pop(0)
+        self._query_cache[cache_key] = (tuple(top_foods), tuple(top_scores))
+        self._query_cache_keys.append(cache_key)
+        self._query_vectors.append(query_vector)
+
+        return top_foods, top_scores
+
+    def _bm25_scores(self, query: str) -> np.ndarray:
+        """Score the whole corpus against one query via posting lists"""
+        scores = np.zeros(self._bm25_csr.shape[1], dtype=np.float32)
+        for token in self._analyzer(query):
+            posting = self._postings.get(token)
+            if posting is not None:
+                scores[posting] += self._weights[token]
+        return scores
+
+    def _score_and_rank(self, query: str, query_vector, top_k: int) -> Tuple[List[FoodItem], List[float]]:
+        """Score every document against the query and return the top-k"""
+
+        # BM25 scores: gather the precomputed rows for the query terms
+        # and sum down the columns
+        bm25_scores = self._bm25_scores(query)
+
+        # TF-IDF scores: the vectorizer L2-normalizes every row (its
+        # norm='l2' default), so the cosine is just a sparse dot product
+        # without cosine_similarity's per-call renormalization
+        tfidf_scores = (query_vector @ self.tfidf_matrix.T).toarray().ravel()
+
+        return self._combine_scores(bm25_scores, tfidf_scores, top_k)
+
+    def _combine_scores(self, bm25_scores: np.ndarray, tfidf_scores: np.ndarray, top_k: int) -> Tuple[List[FoodItem], List[float]]:
+        """Normalize, weight and rank the two score arrays"""
+
         # Combine scores (weighted average)
         bm25_weight = 0.4
         tfidf_weight = 0.6
-        
-        # Normalize scores to [0, 1]
-        if bm25_scores.max() > bm25_scores.min():
-            bm25_scores = (bm25_scores - bm25_scores.min()) / (bm25_scores.max() - bm25_scores.min())
-        else:
-            bm25_scores = np.ones_like(bm25_scores) * 0.5
-        
-        if tfidf_scores.max() > tfidf_scores.min():
-            tfidf_scores = (tfidf_scores - tfidf_scores.min()) / (tfidf_scores.max() - tfidf_scores.min())
+
+        # Fused normalize+combine: fold each min-max into a scale plus a
+        # constant offset, then run in-place ops. Both input arrays are
+        # fresh per call, so mutating them is safe. A constant array
+        # degenerates to a flat 0.5 contribution, as before.
+        bmin, bmax = bm25_scores.min(), bm25_scores.max()
+        tmin, tmax = tfidf_scores.min(), tfidf_scores.max()
+        b_scale = bm25_weight / (bmax - bmin) if bmax > bmin else 0.0
+        t_scale = tfidf_weight / (tmax - tmin) if tmax > tmin else 0.0
+        offset = (bmin * b_scale + tmin * t_scale
+                  - (0.0 if b_scale else 0.5 * bm25_weight)
+                  - (0.0 if t_scale else 0.5 * tfidf_weight))
+        tfidf_scores *= t_scale
+        combined_scores = bm25_scores
+        combined_scores *= b_scale
+        combined_scores += tfidf_scores
+        combined_scores -= offset
+        
+        # Get top-k results: partition out the k best, then sort only those
+        n_foods = len(combined_scores)
+        if top_k < n_foods:
+            top_indices = np.argpartition(combined_scores, -top_k)[-top_k:]
         else:
-            tfidf_scores = np.ones_like(tfidf_scores) * 0.5
-        
-        combined_scores = bm25_weight * bm25_scores + tfidf_weight * tfidf_scores
-        
-        # Get top-k results
-        top_indices = np.argsort(combined_scores)[::-1][:top_k]
+            top_indices = np.arange(n_foods)
+        top_indices = top_indices[np.argsort(-combined_scores[top_indices])]
         top_foods = [self.foods[i] for i in top_indices]
         top_scores = [combined_scores[i] for i in top_indices]
-        
+
         return top_foods, top_scores
     
     def generate_answer(self, query: str, retrieved_foods: List[FoodItem], scores: List[float]) -> Tuple[str, str]:
@@ -144,7 +419,7 @@ class SimpleHybridRetriever:
         if not retrieved_foods or max(scores) < 0.3:
             internal_confidence = "Low"
             answer = f"I'm not sure about '{query}', but here's what we do know: "
-            answer += f"{retrieved_foods[0].name} is a {retrieved_foods[0].category.lower()} with {retrieved_foods[0].note.lower()}"
+            answer += f"{retrieved_foods[0].name} is a {self._category_lower[retrieved_foods[0].name]} with {self._note_lower[retrieved_foods[0].name]}"
         elif max(scores) > 0.7:
             internal_confidence = "High"
             answer = self._generate_detailed_answer(query, retrieved_foods)
@@ -182,116 +457,86 @@ class SimpleHybridRetriever:
             return "❌ **No information found**\n📚 **Source:** Database"
         
         primary_food = foods[0]
-        food_name = primary_food.name.lower()
+        food_name = self._name_lower[primary_food.name]
         query_lower = query.lower()
         
-        response_parts = []
-        
         # 1. SAFETY VERDICT (✅ + bold)
         age_info = self._extract_age_info(primary_food)
         if 'can i' in query_lower or 'safe' in query_lower:
             if age_info:
-                response_parts.append(f"✅ **Yes, {food_name} is safe** {age_info}")
+                verdict = f"✅ **Yes, {food_name} is safe** {age_info}"
             else:
-                response_parts.append(f"✅ **Yes, {food_name} is safe** for babies")
+                verdict = f"✅ **Yes, {food_name} is safe** for babies"
         else:
             # Nutrient-focused responses without icons
             if 'protein' in query_lower:
-                response_parts.append(f"**{primary_food.name} provides** {primary_food.protein_g}g protein per 100g")
+                verdict = f"**{primary_food.name} provides** {primary_food.protein_g}g protein per 100g"
             elif 'iron' in query_lower:
-                response_parts.append(f"**{primary_food.name} contains** {primary_food.iron_mg}mg iron per 100g")
+                verdict = f"**{primary_food.name} contains** {primary_food.iron_mg}mg iron per 100g"
             elif 'vitamin c' in query_lower:
-                response_parts.append(f"**{primary_food.name} has** {primary_food.vit_c_mg}mg vitamin C per 100g")
+                verdict = f"**{primary_food.name} has** {primary_food.vit_c_mg}mg vitamin C per 100g"
             else:
-                response_parts.append(f"✅ **{primary_food.name} is** a nutritious {primary_food.category.lower()}")
-        
-        # 2. WHY IT MATTERS (reasoning without icon)
+                verdict = f"✅ **{primary_food.name} is** a nutritious {self._category_lower[primary_food.name]}"
+
+        # 2-6. Helper sections; empty ones drop out in the final join
         why_explanation = self._get_why_it_matters(primary_food, query_lower)
-        if why_explanation:
-            response_parts.append(f"\n**Why it matters:** {why_explanation}")
-        
-        # 3. PREPARATION (spacing without icon)
         prep = self._get_simple_prep_instruction(primary_food)
-        if prep:
-            response_parts.append(f"\n**Prep:** {prep}")
-        
-        # 4. KEY WARNING (bold without icon)
         warning = self._get_simple_warning(primary_food)
-        if warning:
-            response_parts.append(f"\n**Note:** {warning}")
-        
-        # 5. BENEFIT (benefit info without icon)
         benefit = self._get_nutritional_benefit(primary_food)
-        if benefit:
-            response_parts.append(f"\n**Benefit:** {benefit}")
-        
-        # 6. ACTIONABLE NEXT STEP (practical action without icon)
         action_step = self._get_actionable_next_step(primary_food, query_lower)
         if action_step:
-            # Remove icon from action step
-            clean_action = action_step.replace("👍 **Next step:**", "**Next step:**").replace("🚫 **Next step:**", "**Next step:**").replace("⚠️ **Next step:**", "**Next step:**")
-            response_parts.append(f"\n{clean_action}")
-        
-        # 7. SOURCE (clean without icon)
-        response_parts.append("\n**Sources:** AAP/CDC Guidelines")
-        
-        return "".join(response_parts)
+            # Remove icon from action step in one scan
+            action_step = _ICON_RE.sub('**Next step:**', action_step)
+
+        # 7. SOURCE plus one join over the truthy sections
+        return "\n".join(section for section in (
+            verdict,
+            f"**Why it matters:** {why_explanation}" if why_explanation else "",
+            f"**Prep:** {prep}" if prep else "",
+            f"**Note:** {warning}" if warning else "",
+            f"**Benefit:** {benefit}" if benefit else "",
+            action_step,
+            "**Sources:** AAP/CDC Guidelines",
+        ) if section)
     
     def _get_actionable_next_step(self, food: FoodItem, query: str) -> str:
         """Generate practical next step for parents"""
-        food_name = food.name.lower()
-        note_lower = food.note.lower()
-        
-        # Safety-first actions
-        if 'honey' in food_name:
+        food_name = self._name_lower[food.name]
+        flags = self._action_flags[food.name]
+
+        # Safety-first actions, dispatched on the precomputed bitmask
+        if flags & _FLAG_HONEY:
             return "🚫 **Next step:** Avoid before 12 months. Try maple syrup or mashed banana for sweetness instead."
-        
-        if 'choking' in note_lower:
-            if 'grape' in food_name:
+
+        if flags & _FLAG_CHOKING:
+            if flags & _FLAG_GRAPE:
                 return "⚠️ **Next step:** Always quarter grapes lengthwise. Never give whole grapes."
             else:
                 return "⚠️ **Next step:** Prepare safely to avoid choking. Always supervise eating."
-        
+
         # Query-specific actions
-        if 'first food' in query or 'start' in query:
-            first_food_actions = {
-                'banana': "👍 **Next step:** Perfect starter! Try mashed banana mixed into baby cereal at breakfast.",
-                'apple': "👍 **Next step:** Steam and mash smooth. Great first fruit to introduce.",
-                'sweet potato': "👍 **Next step:** Steam until very soft, mash smooth. Excellent first vegetable.",
-                'rice cereal': "👍 **Next step:** Mix thin with breast milk. Traditional first food choice.",
-                'avocado': "👍 **Next step:** Mash ripe avocado smooth. Rich, creamy first food."
-            }
-            if food_name in first_food_actions:
-                return first_food_actions[food_name]
+        if _FIRST_FOOD_QUERY_RE.search(query):
+            if food_name in _FIRST_FOOD_ACTIONS:
+                return _FIRST_FOOD_ACTIONS[food_name]
         
         # Food-specific practical actions
-        actions = {
-            'banana': "👍 **Next step:** Try at breakfast mashed into oatmeal or as finger food strips.",
-            'apple': "👍 **Next step:** Steam and mash, or try as soft cooked pieces for texture practice.",
-            'chicken': "👍 **Next step:** Cook thoroughly, shred finely, and mix with favorite vegetables.",
-            'salmon': "👍 **Next step:** Cook well, check carefully for bones, and flake into small pieces.",
-            'egg': "👍 **Next step:** Scramble well-cooked and try at breakfast. Great protein source.",
-            'yogurt': "👍 **Next step:** Offer plain whole-milk yogurt as snack or mixed with fruit.",
-            'spinach': "👍 **Next step:** Steam and puree, then mix into pasta or rice dishes.",
-            'rice cereal': "👍 **Next step:** Start thin, gradually thicken as baby adapts to textures."
-        }
-        
-        if food_name in actions:
-            return actions[food_name]
+        if food_name in _ACTIONS:
+            return _ACTIONS[food_name]
         
         # Generic action based on food category
-        if food.category.lower() == 'fruit':
+        category = self._category_lower[food.name]
+        if category == 'fruit':
             return "👍 **Next step:** Try mashed first, then soft pieces as baby develops chewing skills."
-        elif food.category.lower() == 'vegetable':
+        elif category == 'vegetable':
             return "👍 **Next step:** Steam until very soft, start with puree, progress to small pieces."
-        elif food.category.lower() == 'protein':
+        elif category == 'protein':
             return "👍 **Next step:** Cook thoroughly and start with very small, soft pieces."
         else:
             return "👍 **Next step:** Start with small portions and watch for baby's reaction."
 
     def _get_why_it_matters(self, food: FoodItem, query: str) -> str:
         """Explain why this food recommendation matters"""
-        food_name = food.name.lower()
+        food_name = self._name_lower[food.name]
         
         # Query-specific explanations
         if 'first food' in query or 'start' in query:
@@ -308,18 +553,7 @@ class SimpleHybridRetriever:
             return 'Vitamin C supports immune system development and helps your baby absorb iron from other foods'
         
         # Food-specific explanations
-        explanations = {
-            'banana': 'Bananas are gentle first foods - naturally sweet, easy to mash, and rich in potassium for healthy muscle development',
-            'avocado': 'Avocados provide healthy fats essential for brain development during this critical growth period',
-            'apple': 'Apples introduce natural sweetness and fiber, helping develop taste preferences for healthy foods',
-            'sweet potato': 'Sweet potatoes are naturally sweet and packed with beta-carotene for healthy vision development',
-            'chicken': 'Chicken provides complete protein with all amino acids needed for your baby\'s rapid growth',
-            'salmon': 'Salmon offers omega-3s crucial for brain development during the first year of life',
-            'egg': 'Eggs are nutritional powerhouses and early introduction may help prevent allergies later',
-            'spinach': 'Leafy greens provide iron and folate for healthy blood development, though portions should be small for young babies'
-        }
-        
-        return explanations.get(food_name, f'{food.name} provides important nutrients during your baby\'s critical development phase')
+        return _EXPLANATIONS.get(food_name, f'{food.name} provides important nutrients during your baby\'s critical development phase')
 
     def _get_simple_prep_instruction(self, food: FoodItem) -> str:
         """Get simplified preparation instruction from food note"""
@@ -337,34 +571,33 @@ class SimpleHybridRetriever:
     
     def _get_simple_warning(self, food: FoodItem) -> str:
         """Get simplified warning from food note"""
-        note = food.note.lower()
-        if 'choking' in note:
+        hits = {match.lastgroup for match in _WARNING_RE.finditer(self._note_lower[food.name])}
+        if 'choking' in hits:
             return "Potential choking hazard - ensure proper preparation"
-        elif 'allergy' in note:
+        elif 'allergy' in hits:
             return "Watch for potential allergic reactions"
-        elif 'iron' in note and 'spinach' in note:
+        elif 'iron' in hits and 'spinach' in hits:
             return "High in oxalates; serve in moderation and ensure a balanced diet"
         return ""
-    
+
     def _extract_age_info(self, food: FoodItem) -> str:
         """Extract age information from food note"""
-        note = food.note.lower()
-        if 'safe from 6 months' in note:
-            return "from 6 months"
-        elif 'safe from 12 months' in note:
-            return "from 12 months"
-        elif '6 months' in note:
+        # '6 months' matching anywhere subsumes 'safe from 6 months' and
+        # keeps priority over a 12-month mention, like the old chain
+        hits = {match.lastgroup for match in _AGE_RE.finditer(self._note_lower[food.name])}
+        if 'm6' in hits:
             return "from 6 months"
-        elif '12 months' in note:
+        elif 'm12' in hits:
             return "from 12 months"
         return ""
     
     def _extract_prep_instructions(self, food: FoodItem) -> str:
         """Extract preparation instructions from food note"""
         note = food.note
-        if 'how to prepare:' in note.lower():
+        note_lower = self._note_lower[food.name]
+        if 'how to prepare:' in note_lower:
             # Extract the preparation part
-            prep_start = note.lower().find('how to prepare:') + len('how to prepare:')
+            prep_start = note_lower.find('how to prepare:') + len('how to prepare:')
             prep_end = note.find('|', prep_start)
             if prep_end == -1:
                 prep_text = note[prep_start:].strip()
@@ -375,7 +608,7 @@ class SimpleHybridRetriever:
     
     def _extract_safety_guidance(self, food: FoodItem) -> str:
         """Extract safety warnings from food note"""
-        note = food.note.lower()
+        note = self._note_lower[food.name]
         if 'watch out for:' in note:
             # Extract safety warning
             safety_start = note.find('watch out for:') + len('watch out for:')
@@ -393,10 +626,9 @@ class SimpleHybridRetriever:
     
     def _extract_sources(self, food: FoodItem) -> str:
         """Extract source information"""
-        note = food.note
         sources = []
-        
-        if 'pediatrician-recommended' in note.lower():
+
+        if 'pediatrician-recommended' in self._note_lower[food.name]:
             sources.append("AAP/CDC Guidelines")
         
         # Always include our curated database
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
 from app.data_loader import DataLoader
@@ -14,16 +16,6 @@ except ImportError as e:
     print(f"Sentence transformers not available ({e}), using simple retriever")
     from app.simple_retriever import SimpleHybridRetriever as HybridRetriever
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Baby Food RAG API",
-    description="A retrieval-augmented generation API for baby food recommendations",
-    version="1.0.0"
-)
-
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
 # Initialize data and retriever
 def initialize_retriever():
     try:
@@ -34,9 +26,9 @@ def initialize_retriever():
         
         # Initialize retriever
         retriever = HybridRetriever(foods, descriptions)
-        
-        # Set global retriever in ask router
-        ask.retriever = retriever
+
+        # Share the retriever through app state
+        app.state.retriever = retriever
         
         print(f"Successfully loaded {len(foods)} baby foods")
         return retriever
@@ -45,10 +37,25 @@ def initialize_retriever():
         print(f"Error initializing retriever: {e}")
         raise
 
-# Initialize on startup
-@app.on_event("startup")
-async def startup_event():
-    initialize_retriever()
+# Startup via lifespan: load data and build indexes in a worker thread
+# so the event loop stays free, then run one throwaway retrieval to warm
+# lazy imports and the BLAS thread pool before the first real request
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    retriever = await asyncio.to_thread(initialize_retriever)
+    await asyncio.to_thread(retriever.retrieve, "warmup query")
+    yield
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="Baby Food RAG API",
+    description="A retrieval-augmented generation API for baby food recommendations",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Mount static files
+app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include routers
 app.include_router(ask.router, prefix="/api", tags=["ask"])
@@ -68,7 +75,7 @@ async def health_check():
 async def reload_data():
     """Development endpoint to reload data without restarting server"""
     try:
-        initialize_retriever()
+        await asyncio.to_thread(initialize_retriever)
         return {"status": "success", "message": "Data reloaded successfully"}
     except Exception as e:
         return {"status": "error", "message": f"Failed to reload data: {str(e)}"}